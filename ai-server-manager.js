@@ -106,30 +106,26 @@ class AIServerManager {
             const output = data.toString();
             console.log('AI Server:', output);
             
-            // Check for server startup messages
-            if (output.includes('Uvicorn running on') || 
-                output.includes('Running on') || 
-                output.includes('Application startup complete')) {
+            // The server prints this line once the model is loaded and warmed up;
+            // uvicorn's own startup messages come earlier, before the model is ready
+            if (output.includes('AETHERFLOW_READY')) {
                 clearTimeout(startupTimeout);
                 this.serverReady = true;
                 console.log('✅ AI Server is ready!');
                 resolve();
             }
+            // Printed when the model could not be loaded; the server keeps
+            // retrying, but startup has failed as far as the app is concerned
+            const failure = output.split('\n').find((line) => line.startsWith('AETHERFLOW_FAILED'));
+            if (failure && !this.serverReady) {
+                clearTimeout(startupTimeout);
+                reject(new Error(`AI server failed to load the model: ${failure.slice('AETHERFLOW_FAILED error='.length)}`));
+            }
         });
 
         this.aiProcess.stderr.on('data', (data) => {
             const output = data.toString();
             console.error('AI Server Error:', output);
-            
-            // IMPORTANT: Also check stderr for startup messages since uvicorn logs there
-            if (output.includes('Uvicorn running on') || 
-                output.includes('Application startup complete') ||
-                output.includes('Model loaded successfully')) {
-                clearTimeout(startupTimeout);
-                this.serverReady = true;
-                console.log('✅ AI Server is ready!');
-                resolve();
-            }
         });
 
         this.aiProcess.on('error', (error) => {
@@ -147,12 +143,13 @@ class AIServerManager {
     async waitForServer() {
         if (this.serverReady) return true;
         
-        // Test if server is responding on both localhost and 127.0.0.1
+        // Test if the model is ready on both localhost and 127.0.0.1
+        // (/health only says the process is up; /ready waits for the model)
         const maxAttempts = 20;
         for (let i = 0; i < maxAttempts; i++) {
             try {
                 // Try localhost first
-                const response = await fetch('http://localhost:8000/health');
+                const response = await fetch('http://localhost:8000/ready');
                 if (response.ok) {
                     this.serverReady = true;
                     return true;
@@ -160,7 +157,7 @@ class AIServerManager {
             } catch (error) {
                 // Try 127.0.0.1 as fallback
                 try {
-                    const response = await fetch('http://127.0.0.1:8000/health');
+                    const response = await fetch('http://127.0.0.1:8000/ready');
                     if (response.ok) {
                         this.serverReady = true;
                         return true;
@@ -1,42 +1,69 @@
 #!/usr/bin/env python3
 """
 Build script to create standalone Python executable for AetherFlow AI model
+
+Profiles:
+  onefile  single self-extracting executable (re-extracted on every launch)
+  slim     onedir bundle without the modules the serving path never imports;
+           serves the pickle-free .npz artifacts, so sklearn, pandas and
+           joblib are left out
+
+After building, each profile's bundle size and measured time-to-ready
+(launch until the server prints its AETHERFLOW_READY line) are printed.
 """
+import argparse
 import os
+import queue
 import subprocess
 import sys
 import shutil
+import threading
+import time
 
-def main():
-    print("🔧 Building AetherFlow AI Server...")
-    
-    # Change to model directory
-    model_dir = os.path.join(os.path.dirname(__file__), 'model')
-    os.chdir(model_dir)
-    
-    # Install PyInstaller if not present
-    try:
-        import PyInstaller
-    except ImportError:
-        print("📦 Installing PyInstaller...")
-        subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'pyinstaller'])
-    
-    # Create the executable
-    print("🚀 Creating standalone executable...")
-    
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model'))
+from benchmark_utils import free_port
+
+# Modules the slim bundle leaves out: plotting and notebook packages from
+# requirements.txt, and the sklearn/pandas stack only needed to unpickle
+MODULE_EXCLUDES = [
+    'matplotlib', 'seaborn', 'tabulate', 'IPython', 'tkinter', 'PIL', 'pytest',
+    'sklearn', 'scipy', 'pandas', 'joblib', 'pyarrow'
+]
+
+# Imports uvicorn makes by name at runtime, which PyInstaller cannot see
+UVICORN_HIDDEN_IMPORTS = [
+    'inference_api', 'model_artifact',
+    'uvicorn.logging', 'uvicorn.loops.auto', 'uvicorn.protocols.http.auto',
+    'uvicorn.protocols.websockets.auto', 'uvicorn.lifespan.on'
+]
+
+# Seconds to wait for a built server to report ready, and for it to exit
+# once terminated before it is killed
+READY_TIMEOUT = 120
+SHUTDOWN_TIMEOUT = 10
+
+def executable_name():
+    return 'aetherflow-ai-server.exe' if os.name == 'nt' else 'aetherflow-ai-server'
+
+def onefile_command():
+    """PyInstaller command for the single-file build."""
     # Get the full paths to the model files
     enhanced_model_path = os.path.abspath('enhanced_sickle_cell_model.pkl')
     crisis_model_path = os.path.abspath('sickle_cell_crisis_model.pkl')
-    
-    cmd = [
+    enhanced_artifact_path = os.path.abspath('enhanced_sickle_cell_model.npz')
+    crisis_artifact_path = os.path.abspath('sickle_cell_crisis_model.npz')
+
+    return [
         'pyinstaller',
         '--onefile',
         '--name', 'aetherflow-ai-server',
         '--distpath', '../ai-server',
         '--workpath', 'build',
         '--specpath', 'build',
-        '--add-data', f'{enhanced_model_path};.',
-        '--add-data', f'{crisis_model_path};.',
+        '--add-data', f'{enhanced_model_path}{os.pathsep}.',
+        '--add-data', f'{crisis_model_path}{os.pathsep}.',
+        '--add-data', f'{enhanced_artifact_path}{os.pathsep}.',
+        '--add-data', f'{crisis_artifact_path}{os.pathsep}.',
         '--hidden-import', 'sklearn.ensemble._forest',
         '--hidden-import', 'sklearn.tree._tree',
         '--hidden-import', 'sklearn.neighbors._typedefs',
@@ -45,10 +72,130 @@ def main():
         '--hidden-import', 'sklearn.neighbors._partition_nodes',
         'inference_api.py'
     ]
+
+def slim_command():
+    """PyInstaller command for the slim onedir build."""
+    cmd = [
+        'pyinstaller',
+        '--onedir',
+        '--noconfirm',
+        '--name', 'aetherflow-ai-server',
+        '--distpath', '../ai-server-slim',
+        '--workpath', 'build-slim',
+        '--specpath', 'build-slim'
+    ]
+    # Only the pickle-free artifacts: without sklearn the pickles cannot be loaded
+    for artifact in ('enhanced_sickle_cell_model.npz', 'sickle_cell_crisis_model.npz'):
+        cmd += ['--add-data', f'{os.path.abspath(artifact)}{os.pathsep}.']
+    for module in UVICORN_HIDDEN_IMPORTS:
+        cmd += ['--hidden-import', module]
+    for module in MODULE_EXCLUDES:
+        cmd += ['--exclude-module', module]
+    cmd.append('inference_api.py')
+    return cmd
+
+PROFILES = {
+    'onefile': (onefile_command, os.path.join('..', 'ai-server')),
+    'slim': (slim_command, os.path.join('..', 'ai-server-slim', 'aetherflow-ai-server'))
+}
+
+def bundle_size(path):
+    """Total size in bytes of a file or directory."""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+def read_lines(stream, lines):
+    """Put each line of stream on a queue, then None at end of file."""
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+def measure_time_to_ready(exe_path):
+    """Launch a built server and return seconds until it prints its ready line.
     
-    subprocess.check_call(cmd)
-    
-    print("✅ AI Server executable created at: ../ai-server/aetherflow-ai-server.exe")
+    Returns None if the server reports AETHERFLOW_FAILED, exits, or stays
+    silent past READY_TIMEOUT. Its output is read on a thread, so a server
+    that prints nothing cannot stall the build.
+    """
+    env = dict(os.environ, AETHERFLOW_PORT=str(free_port()), AETHERFLOW_READY_LINE='1')
+    started = time.perf_counter()
+    deadline = started + READY_TIMEOUT
+    server = subprocess.Popen(
+        [exe_path], env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    lines = queue.Queue()
+    threading.Thread(target=read_lines, args=(server.stdout, lines), daemon=True).start()
+    try:
+        while True:
+            try:
+                line = lines.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                print(f"⚠️  Server not ready after {READY_TIMEOUT}s")
+                return None
+            if line is None:
+                print(f"⚠️  Server exited with status {server.wait()} before it was ready")
+                return None
+            if line.startswith('AETHERFLOW_READY'):
+                return time.perf_counter() - started
+            if line.startswith('AETHERFLOW_FAILED'):
+                print(f"⚠️  {line.strip()}")
+                return None
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+def report(results):
+    """Print bundle size and time-to-ready for each built profile."""
+    print("\n📊 Build comparison")
+    print(f"{'profile':<10} {'bundle size':>12} {'time to ready':>15}")
+    for profile, (size, ready) in results.items():
+        ready_text = f"{ready:.2f}s" if ready is not None else "not ready"
+        print(f"{profile:<10} {size / (1024 * 1024):>10.1f}MB {ready_text:>15}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the AetherFlow AI server executable")
+    parser.add_argument('--profile', choices=['onefile', 'slim', 'all'], default='onefile',
+                        help="Bundle layout to build ('all' builds both and compares them)")
+    parser.add_argument('--skip-benchmark', action='store_true', help="Do not launch the built server")
+    args = parser.parse_args()
+
+    print("🔧 Building AetherFlow AI Server...")
+
+    # Change to model directory
+    model_dir = os.path.join(os.path.dirname(__file__), 'model')
+    os.chdir(model_dir)
+
+    # Install PyInstaller if not present
+    try:
+        import PyInstaller
+    except ImportError:
+        print("📦 Installing PyInstaller...")
+        subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'pyinstaller'])
+
+    profiles = ['onefile', 'slim'] if args.profile == 'all' else [args.profile]
+    results = {}
+    for profile in profiles:
+        command, output_dir = PROFILES[profile]
+        print(f"🚀 Creating {profile} executable...")
+        subprocess.check_call(command())
+
+        exe_path = os.path.abspath(os.path.join(output_dir, executable_name()))
+        bundle_path = exe_path if profile == 'onefile' else os.path.abspath(output_dir)
+        print(f"✅ AI Server executable created at: {exe_path}")
+
+        ready = None if args.skip_benchmark else measure_time_to_ready(exe_path)
+        results[profile] = (bundle_size(bundle_path), ready)
+
+    report(results)
     print("🎉 Build complete!")
 
 if __name__ == "__main__":
@@ -0,0 +1,224 @@
+"""
+Offline batch scoring for Sickle Cell Crisis Prediction.
+
+Scores a CSV or Parquet file without the HTTP server, e.g.
+
+    python batch_score.py sickle_cell_crisis_simulated.csv scores.csv --workers 4
+
+The input is read in chunks and the chunks are scored on a process pool,
+each worker holding its own copy of the model. Columns may use training
+names (PainLevel, WBC_Count, ...) or API names (pain_level, wbc_count, ...).
+Unlike the API, rows are not range-validated: missing values are imputed
+with the training medians, as the model pipeline does.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import inference_api as api
+
+# Rows read and scored per chunk
+DEFAULT_CHUNK_SIZE = 5000
+
+# Input columns copied to the output to identify each row
+PASSTHROUGH_COLUMNS = ['PatientID', 'Day']
+
+# Model runtime held by each worker process
+worker_runtime = None
+
+def init_worker(model_key):
+    """Load the model once per worker process."""
+    global worker_runtime
+    worker_runtime = api.model_registry.load(model_key)
+
+def detect_format(path, explicit=None):
+    """Return 'csv' or 'parquet' for a path, honouring an explicit choice."""
+    if explicit:
+        return explicit
+    return 'parquet' if path.lower().endswith(('.parquet', '.pq')) else 'csv'
+
+def iter_chunks(path, file_format, chunk_size):
+    """Yield DataFrames of at most chunk_size rows from a CSV or Parquet file."""
+    if file_format == 'csv':
+        yield from pd.read_csv(path, chunksize=chunk_size)
+        return
+
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Reading Parquet requires pyarrow (pip install pyarrow)")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield batch.to_pandas()
+
+def to_training_columns(chunk):
+    """Rename API field names to training column names and check nothing is missing."""
+    chunk = chunk.rename(columns=api.FIELD_MAPPING)
+    missing = [col for col in api.FIELD_MAPPING.values() if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Input is missing required columns: {', '.join(missing)}")
+    return chunk
+
+def chunk_to_columns(chunk):
+    """Build the column arrays the fused scorer expects from a training-style chunk."""
+    columns = {}
+    for col in api.FIELD_MAPPING.values():
+        if col in api.CATEGORICAL_COLUMNS:
+            # Missing categories were encoded as the string 'nan' during training
+            values = chunk[col].astype(object).where(chunk[col].notna(), 'nan')
+            columns[col] = np.array([str(value) for value in values])
+        else:
+            columns[col] = pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=float)
+    return columns
+
+def format_top_factors(runtime, X):
+    """Return the top risk factors of every row as 'name:+0.1234; ...' strings."""
+    positions, contributions = api.explain_contributions(runtime, X)
+    names = runtime.explain_display_names
+    return [
+        '; '.join(f"{names[i]}:{c:+.4f}" for i, c in zip(row_positions, row_contributions))
+        for row_positions, row_contributions in zip(positions.tolist(), contributions.tolist())
+    ]
+
+def score_chunk(chunk):
+    """Score one chunk in a worker; returns (results, worker pid, busy seconds)."""
+    started = time.perf_counter()
+    runtime = worker_runtime
+    chunk = to_training_columns(chunk)
+    columns = chunk_to_columns(chunk)
+
+    # Rows with categories the encoders never saw cannot be scored
+    errors = np.full(len(chunk), '', dtype=object)
+    for col in api.CATEGORICAL_COLUMNS:
+        if col in runtime.label_lookup:
+            unseen = ~np.isin(columns[col], list(runtime.label_lookup[col]))
+            errors[unseen & (errors == '')] = f"{col}: unseen label"
+    scorable = errors == ''
+
+    probabilities = np.full(len(chunk), np.nan)
+    top_factors = np.full(len(chunk), '', dtype=object)
+    if scorable.any():
+        selected = {col: values[scorable] for col, values in columns.items()}
+        if runtime.fused_scorer is not None:
+            X = runtime.fused_scorer.feature_matrix(selected)
+            probabilities[scorable] = runtime.fused_scorer.predict_proba(X)
+        else:
+            patient_df, scored = api.score_frame_with_pipeline(runtime.package, pd.DataFrame(selected))
+            X = patient_df[runtime.feature_names].to_numpy(dtype=float)
+            probabilities[scorable] = scored
+        top_factors[scorable] = format_top_factors(runtime, X)
+
+    results = pd.DataFrame({
+        col: chunk[col].to_numpy() for col in PASSTHROUGH_COLUMNS if col in chunk.columns
+    })
+    results['crisis_probability'] = probabilities
+    results['risk_level'] = [
+        api.get_risk_level(p) if ok else '' for p, ok in zip(probabilities, scorable)
+    ]
+    results['top_risk_factors'] = top_factors
+    results['error'] = errors
+    return results, os.getpid(), time.perf_counter() - started
+
+class ResultWriter:
+    """Appends result chunks to a CSV or Parquet file."""
+
+    def __init__(self, path, file_format):
+        self.path = path
+        self.file_format = file_format
+        self.parquet_writer = None
+        self.rows = 0
+        if file_format == 'parquet':
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                raise SystemExit("Writing Parquet requires pyarrow (pip install pyarrow)")
+            self.pa = pyarrow
+
+    def write(self, results):
+        if self.file_format == 'csv':
+            results.to_csv(self.path, mode='w' if self.rows == 0 else 'a', header=self.rows == 0, index=False)
+        else:
+            table = self.pa.Table.from_pandas(results, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = self.pa.parquet.ParquetWriter(self.path, table.schema)
+            self.parquet_writer.write_table(table)
+        self.rows += len(results)
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+def score_file(input_path, output_path, model_key=None, workers=None,
+               chunk_size=DEFAULT_CHUNK_SIZE, input_format=None, output_format=None):
+    """Score every row of input_path into output_path and return run statistics."""
+    model_key = api.canonical_model_key(model_key)
+    workers = max(1, workers or os.cpu_count() or 1)
+    writer = ResultWriter(output_path, detect_format(output_path, output_format))
+    busy = defaultdict(float)
+    chunks_done = 0
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(model_key,)) as pool:
+        pending = []
+        try:
+            for chunk in iter_chunks(input_path, detect_format(input_path, input_format), chunk_size):
+                pending.append(pool.submit(score_chunk, chunk))
+                # Keep a bounded number of chunks in flight; write in input order
+                while len(pending) > 2 * workers:
+                    results, pid, seconds = pending.pop(0).result()
+                    writer.write(results)
+                    busy[pid] += seconds
+                    chunks_done += 1
+            for future in pending:
+                results, pid, seconds = future.result()
+                writer.write(results)
+                busy[pid] += seconds
+                chunks_done += 1
+        finally:
+            writer.close()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'model': model_key,
+        'rows': writer.rows,
+        'chunks': chunks_done,
+        'seconds': elapsed,
+        'rows_per_second': writer.rows / elapsed if elapsed > 0 else 0.0,
+        'worker_utilization': {pid: seconds / elapsed for pid, seconds in sorted(busy.items())}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file with the crisis prediction model")
+    parser.add_argument('input', help="Input CSV or Parquet file")
+    parser.add_argument('output', help="Output CSV or Parquet file")
+    parser.add_argument('--model', default=None, help="Model to use, as name or name@version")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk")
+    parser.add_argument('--input-format', choices=['csv', 'parquet'], default=None)
+    parser.add_argument('--output-format', choices=['csv', 'parquet'], default=None)
+    args = parser.parse_args()
+
+    try:
+        stats = score_file(
+            args.input, args.output, model_key=args.model, workers=args.workers,
+            chunk_size=args.chunk_size, input_format=args.input_format, output_format=args.output_format
+        )
+    except (api.UnknownModelError, FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"Scored {stats['rows']} rows in {stats['chunks']} chunks with {stats['model']}")
+    print(f"Elapsed: {stats['seconds']:.2f}s ({stats['rows_per_second']:.0f} rows/s)")
+    print("Worker utilization:")
+    for pid, utilization in stats['worker_utilization'].items():
+        print(f"  pid {pid}: {utilization:.1%}")
+
+if __name__ == "__main__":
+    main()
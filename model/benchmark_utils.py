@@ -0,0 +1,58 @@
+"""
+Helpers shared by the benchmark scripts (load_test.py, stage_benchmark.py,
+startup_benchmark.py and build-ai-server.py): picking a free port for a
+server under test, comparing results against a baseline with a tolerance,
+and reading and writing the baseline JSON files.
+"""
+
+import json
+import os
+import socket
+import sys
+
+def free_port():
+    """Return a TCP port on 127.0.0.1 that is free right now."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def check_above(name, value, expected, tolerance, unit=''):
+    """Return a regression message if value exceeds expected by more than tolerance, else None."""
+    if expected is not None and value > expected * (1 + tolerance):
+        return f"{name} {value:.1f}{unit} exceeds baseline {expected:.1f}{unit} by more than {tolerance:.0%}"
+    return None
+
+def check_below(name, value, expected, tolerance, unit=''):
+    """Return a regression message if value is more than tolerance below expected, else None."""
+    if expected is not None and value < expected * (1 - tolerance):
+        return f"{name} {value:.1f}{unit} is more than {tolerance:.0%} below baseline {expected:.1f}{unit}"
+    return None
+
+def load_baseline(path):
+    """Return the baseline stored at path, or None if none was recorded yet."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def write_baseline(path, baseline):
+    """Store a baseline as indented JSON."""
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+    print(f"Baseline written to {path}")
+
+def check_baseline(result, baseline, compare, tolerance, passed_message):
+    """Report regressions of result against a loaded baseline, exiting with status 1 on any.
+    
+    ``compare(result, baseline, tolerance)`` returns the regression messages.
+    """
+    if baseline is None:
+        print("No baseline recorded yet; run with --update")
+        return
+    problems = compare(result, baseline, tolerance)
+    for problem in problems:
+        print(f"REGRESSION: {problem}")
+    if problems:
+        sys.exit(1)
+    print(passed_message)
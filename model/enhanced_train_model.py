@@ -11,6 +11,7 @@ from sklearn.metrics import classification_report, confusion_matrix, roc_auc_sco
 from sklearn.pipeline import Pipeline
 from sklearn.feature_selection import SelectKBest, f_classif, RFE
 import joblib
+from model_artifact import export_model_artifact, get_artifact_path
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
@@ -303,6 +304,14 @@ class EnhancedSickleCellCrisisModel:
         
         joblib.dump(model_package, filepath)
         print(f"Enhanced model saved to {filepath}")
+        
+        # Pickle-free copy for the inference server (linear models only)
+        artifact_path = get_artifact_path(filepath)
+        try:
+            export_model_artifact(model_package, artifact_path, filepath)
+            print(f"Pickle-free artifact saved to {artifact_path}")
+        except ValueError as e:
+            print(f"Skipping pickle-free artifact: {e}")
     
     def predict_crisis_probability(self, patient_data):
         """Predict crisis probability with enhanced model."""
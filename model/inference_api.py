@@ -1,16 +1,38 @@
 # FastAPI Inference Server for Sickle Cell Crisis Prediction
 # AetherFlow Medical AI - Lightweight & Interpretable Model
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, validator
-import joblib
-import pandas as pd
+from pydantic import BaseModel, Field, ValidationError, validator
 import numpy as np
-from typing import Optional, List, Dict
-import uvicorn
+from model_artifact import (
+    MODEL_STATE_ARRAYS, ArtifactMismatchError, extract_model_state, get_artifact_path,
+    json_default, load_model_artifact
+)
+from typing import Optional, List, get_type_hints
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+import asyncio
+import atexit
+import bisect
+import csv
+import hashlib
+import itertools
+import json
 import logging
+import multiprocessing
+import os
+import re
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import zlib
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,8 +56,323 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global model variable
-model_package = None
+# Model artifacts that can be served, by name. Version "latest" is
+# "<stem>.pkl"; any other version resolves to "<stem>_<version>.pkl".
+MODEL_ARTIFACTS = {
+    'enhanced': 'enhanced_sickle_cell_model',
+    'baseline': 'sickle_cell_crisis_model'
+}
+
+# Model served when a request does not pick one ("name" or "name@version")
+DEFAULT_MODEL = os.environ.get('AETHERFLOW_DEFAULT_MODEL', 'enhanced')
+
+# Number of model runtimes kept in memory at once
+MODEL_CACHE_SIZE = int(os.environ.get('AETHERFLOW_MODEL_CACHE_SIZE', '2'))
+
+# Seconds between checks of the model file for changes (0 disables the watcher)
+MODEL_WATCH_INTERVAL = float(os.environ.get('AETHERFLOW_MODEL_WATCH_INTERVAL', '0'))
+
+# Shared secret required by the admin endpoints when set
+ADMIN_TOKEN = os.environ.get('AETHERFLOW_ADMIN_TOKEN')
+
+# Prediction cache size in entries (0 disables) and entry lifetime in seconds
+PREDICTION_CACHE_SIZE = int(os.environ.get('AETHERFLOW_CACHE_SIZE', '1024'))
+PREDICTION_CACHE_TTL = float(os.environ.get('AETHERFLOW_CACHE_TTL', '300'))
+
+# Micro-batching of concurrent /predict calls: how long a batch stays open
+# (0 disables batching) and how many patients it may collect
+BATCH_WINDOW_MS = float(os.environ.get('AETHERFLOW_BATCH_WINDOW_MS', '2'))
+BATCH_MAX_SIZE = int(os.environ.get('AETHERFLOW_BATCH_MAX_SIZE', '64'))
+
+# Where CPU-bound scoring runs: "thread" or "process" pool, its size, and how
+# many scoring jobs may be queued or running before requests get a 503
+SCORING_EXECUTOR = os.environ.get('AETHERFLOW_SCORING_EXECUTOR', 'thread')
+SCORING_WORKERS = int(os.environ.get('AETHERFLOW_SCORING_WORKERS', str(min(4, os.cpu_count() or 1))))
+SCORING_QUEUE_SIZE = int(os.environ.get('AETHERFLOW_SCORING_QUEUE', '64'))
+
+# Number of uvicorn worker processes. With more than one, the parent exports
+# the default model's numeric state to SHARED_MODEL_DIR and the workers
+# memory-map it read-only instead of each unpickling the package.
+SERVER_WORKERS = int(os.environ.get('AETHERFLOW_WORKERS', '1'))
+SHARED_MODEL_DIR = os.environ.get('AETHERFLOW_SHARED_MODEL_DIR')
+
+# Address the server binds to when run as a script (port 0 picks a free
+# port); the ready line and port file report it, so set these to match
+# --host/--port when starting the app with the uvicorn command instead
+SERVER_HOST = os.environ.get('AETHERFLOW_HOST', '127.0.0.1')
+SERVER_PORT = int(os.environ.get('AETHERFLOW_PORT', '8000'))
+
+# Predictions run through the serving path after the model loads, before /ready
+WARMUP_PREDICTIONS = int(os.environ.get('AETHERFLOW_WARMUP_PREDICTIONS', '8'))
+
+# Readiness signals for a supervising process: a line printed to stdout
+# (set AETHERFLOW_READY_LINE=0 to disable) and an optional JSON port file
+READY_LINE_PREFIX = 'AETHERFLOW_READY'
+READY_LINE_ENABLED = os.environ.get('AETHERFLOW_READY_LINE', '1') != '0'
+READY_FILE = os.environ.get('AETHERFLOW_READY_FILE')
+
+# Set by __main__ for its uvicorn workers: each worker records its readiness
+# in this directory and the parent announces once all of them are ready
+WORKER_READY_DIR = os.environ.get('AETHERFLOW_WORKER_READY_DIR')
+
+# Printed to stdout when the default model fails to load, so a supervising
+# process can give up without waiting for its timeout
+FAILED_LINE_PREFIX = 'AETHERFLOW_FAILED'
+
+# A failed startup load is retried, waiting this long (seconds) at first and
+# doubling the wait after every failure up to the maximum
+MODEL_LOAD_RETRY_DELAY = float(os.environ.get('AETHERFLOW_LOAD_RETRY_DELAY', '1'))
+MODEL_LOAD_RETRY_MAX_DELAY = float(os.environ.get('AETHERFLOW_LOAD_RETRY_MAX_DELAY', '30'))
+
+model_reload_lock = asyncio.Lock()
+model_watch_task = None
+model_startup_task = None
+
+ready_file_written = False
+
+# Readiness: 'starting' until the default model is loaded and warmed up, then
+# 'ready'; 'failed' while loading fails (it is retried, and a model loaded by
+# a request or a reload in the meantime makes the server ready too)
+readiness = {'status': 'starting', 'error': None, 'ready_at': None, 'warmup_predictions': 0}
+
+# Largest number of records accepted by /predict/batch in one request
+MAX_BATCH_SIZE = 1000
+
+# Media types for the optional binary wire formats
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+MEDIA_TYPE_ALIASES = {
+    'application/x-msgpack': MSGPACK_MEDIA_TYPE,
+    'application/vnd.msgpack': MSGPACK_MEDIA_TYPE,
+    'application/vnd.apache.arrow.file': ARROW_MEDIA_TYPE
+}
+
+# Rows parsed and scored together by the streaming bulk endpoint
+STREAM_CHUNK_SIZE = int(os.environ.get('AETHERFLOW_STREAM_CHUNK_SIZE', '500'))
+
+# Longest upload line (or multi-line CSV record) in bytes; longer ones are
+# skipped with a per-line error instead of being buffered whole
+STREAM_MAX_LINE_BYTES = int(os.environ.get('AETHERFLOW_STREAM_MAX_LINE_BYTES', str(1024 * 1024)))
+
+# Most bytes inflated from a gzip upload in one step
+STREAM_INFLATE_BYTES = 256 * 1024
+
+# Map API field names to the column names used during training
+FIELD_MAPPING = {
+    'pain_level': 'PainLevel',
+    'hbf_percent': 'HbF_percent',
+    'wbc_count': 'WBC_Count',
+    'ldh': 'LDH',
+    'crp': 'CRP',
+    'fatigue': 'Fatigue',
+    'fever': 'Fever',
+    'joint_pain': 'JointPain',
+    'dactylitis': 'Dactylitis',
+    'shortness_of_breath': 'Shortness_of_Breath',
+    'prior_crises': 'PriorCrises',
+    'history_of_acs': 'History_of_ACS',
+    'coexisting_asthma': 'Coexisting_Asthma',
+    'hydroxyurea': 'Hydroxyurea',
+    'pain_med': 'PainMed',
+    'medication_adherence': 'MedicationAdherence',
+    'hydration_level': 'HydrationLevel',
+    'sleep_quality': 'Sleep_Quality',
+    'reported_stress_level': 'Reported_Stress_Level',
+    'temperature': 'Temperature',
+    'humidity': 'Humidity',
+    'age': 'Age',
+    'sex': 'Sex',
+    'genotype': 'Genotype'
+}
+
+CATEGORICAL_COLUMNS = ['Sex', 'Genotype', 'HydrationLevel']
+
+# Largest disagreement tolerated between the fused scorer and the sklearn pipeline
+FUSED_SCORER_TOLERANCE = 1e-9
+
+# Number of most important features considered when explaining a prediction
+TOP_IMPORTANCE_FEATURES = 10
+
+# Number of risk factors returned per prediction
+TOP_RISK_FACTORS = 5
+
+# Known-good patient used to smoke test a model before it starts serving
+SMOKE_TEST_PATIENT = {
+    'age': 25, 'sex': 'Female', 'genotype': 'HbSS',
+    'pain_level': 8, 'hbf_percent': 3.5, 'wbc_count': 12.5, 'ldh': 350, 'crp': 15.2,
+    'fatigue': 1, 'fever': 1, 'joint_pain': 1, 'dactylitis': 0, 'shortness_of_breath': 1,
+    'prior_crises': 3, 'history_of_acs': 1, 'coexisting_asthma': 0,
+    'hydroxyurea': 1, 'pain_med': 1, 'medication_adherence': 0.8,
+    'hydration_level': 'Low', 'sleep_quality': 3, 'reported_stress_level': 8,
+    'temperature': 30, 'humidity': 75
+}
+
+# Histogram buckets (seconds) for pipeline stages and whole requests
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+def format_labels(labelnames, labelvalues, extra=None):
+    """Render a Prometheus label set."""
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+class Counter:
+    """Monotonic Prometheus counter with optional labels."""
+    
+    kind = 'counter'
+    
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+    
+    def inc(self, *labelvalues, amount=1.0):
+        with self._lock:
+            self._values[labelvalues] += amount
+    
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{format_labels(self.labelnames, labels)} {value}" for labels, value in items]
+
+class Gauge(Counter):
+    """Prometheus gauge; set() overrides, inc()/dec() adjust."""
+    
+    kind = 'gauge'
+    
+    def set(self, *labelvalues, value):
+        with self._lock:
+            self._values[labelvalues] = value
+    
+    def dec(self, *labelvalues, amount=1.0):
+        self.inc(*labelvalues, amount=-amount)
+
+class Histogram:
+    """Prometheus histogram with fixed buckets and optional labels."""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def render(self):
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        lines = []
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, labels, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+STAGE_LATENCY = Histogram(
+    'aetherflow_stage_latency_seconds',
+    'Time spent in each inference pipeline stage',
+    ('stage',)
+)
+REQUEST_LATENCY = Histogram(
+    'aetherflow_request_latency_seconds',
+    'End-to-end HTTP request latency',
+    ('endpoint',)
+)
+REQUESTS_TOTAL = Counter('aetherflow_requests_total', 'HTTP requests served', ('endpoint', 'status'))
+REQUESTS_IN_FLIGHT = Gauge('aetherflow_requests_in_flight', 'HTTP requests being processed', ('endpoint',))
+PREDICTIONS_TOTAL = Counter('aetherflow_predictions_total', 'Predictions returned, by risk level', ('risk_level',))
+MODEL_LOAD_SECONDS = Gauge('aetherflow_model_load_seconds', 'Time taken by the last load of each model', ('model',))
+MODEL_LOADS_TOTAL = Counter('aetherflow_model_loads_total', 'Model loads and reloads', ('model',))
+VALIDATION_ROWS = Counter(
+    'aetherflow_validation_rows_total', 'Batch records validated, by path (columnar or model)', ('path',)
+)
+
+METRICS = [
+    STAGE_LATENCY, REQUEST_LATENCY, REQUESTS_TOTAL, REQUESTS_IN_FLIGHT,
+    PREDICTIONS_TOTAL, MODEL_LOAD_SECONDS, MODEL_LOADS_TOTAL, VALIDATION_ROWS
+]
+
+def record_stage(stage, started):
+    """Record the time since `started` for a pipeline stage and return the current time."""
+    now = time.perf_counter()
+    STAGE_LATENCY.observe(now - started, stage)
+    return now
+
+class MetricsMiddleware:
+    """ASGI middleware tracking request latency, status counts and in-flight requests."""
+    
+    def __init__(self, app):
+        self.app = app
+        self._paths = None
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        # Label by route path only, to keep label cardinality bounded
+        if self._paths is None:
+            self._paths = {getattr(route, 'path', None) for route in app.routes}
+        endpoint = scope['path'] if scope['path'] in self._paths else 'other'
+        status = [500]
+        
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+        
+        started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc(endpoint)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec(endpoint)
+            REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint)
+            REQUESTS_TOTAL.inc(endpoint, str(status[0]))
+
+app.add_middleware(MetricsMiddleware)
+
+# Accepted categorical values (lower-cased where matching ignores case) and
+# the normalized form stored for each; shared by PatientData and the
+# columnar batch validator
+SEX_VALUES = {'male': 'Male', 'female': 'Female', 'm': 'M', 'f': 'F'}
+VALID_GENOTYPES = ['HbSS', 'HbSC', 'HbS-beta', 'HbS-Beta']
+HYDRATION_VALUES = {'low': 'Low', 'medium': 'Medium', 'high': 'High'}
+
+def normalize_sex(value):
+    return SEX_VALUES.get(value.lower())
+
+def normalize_genotype(value):
+    return value if value in VALID_GENOTYPES else None
+
+def normalize_hydration(value):
+    return HYDRATION_VALUES.get(value.lower())
 
 class PatientData(BaseModel):
     """Patient data model for API input validation."""
@@ -80,27 +417,26 @@ class PatientData(BaseModel):
     
     @validator('sex')
     def validate_sex(cls, v):
-        if v.lower() not in ['male', 'female', 'm', 'f']:
+        if normalize_sex(v) is None:
             raise ValueError('Sex must be Male, Female, M, or F')
-        return v.title()
+        return normalize_sex(v)
     
     @validator('genotype')
     def validate_genotype(cls, v):
-        valid_genotypes = ['HbSS', 'HbSC', 'HbS-beta', 'HbS-Beta']
-        if v not in valid_genotypes:
-            raise ValueError(f'Genotype must be one of: {valid_genotypes}')
+        if normalize_genotype(v) is None:
+            raise ValueError(f'Genotype must be one of: {VALID_GENOTYPES}')
         return v
     
     @validator('hydration_level')
     def validate_hydration(cls, v):
-        if v.lower() not in ['low', 'medium', 'high']:
+        if normalize_hydration(v) is None:
             raise ValueError('Hydration level must be Low, Medium, or High')
-        return v.title()
+        return normalize_hydration(v)
 
 class RiskFactor(BaseModel):
     """Risk factor model."""
     factor: str = Field(..., description="Risk factor name")
-    contribution: float = Field(..., description="Contribution score")
+    contribution: float = Field(..., description="Signed contribution to the crisis log-odds")
 
 class PredictionResponse(BaseModel):
     """Response model for crisis prediction."""
@@ -112,26 +448,543 @@ class PredictionResponse(BaseModel):
     model_version: str = Field(..., description="Model version used")
     prediction_timestamp: str = Field(..., description="Timestamp of prediction")
 
-def load_model():
-    """Load the trained model package."""
-    global model_package
-    try:
-        # Get the directory where this script is located
-        import os
-        import sys
-        
-        # Check if running as PyInstaller executable
-        if getattr(sys, 'frozen', False):
-            # Running as executable - model files are in the same directory as the executable
-            script_dir = sys._MEIPASS
-        else:
-            # Running as script - model files are in the same directory as the script
-            script_dir = os.path.dirname(os.path.abspath(__file__))
+class BatchPredictionItem(BaseModel):
+    """Result slot for one record of a batch request."""
+    index: int = Field(..., description="Position of the record in the request")
+    prediction: Optional[PredictionResponse] = Field(None, description="Prediction, if the record could be scored")
+    error: Optional[str] = Field(None, description="Validation or encoding error for this record")
+
+class BatchPredictionResponse(BaseModel):
+    """Response model for batch crisis prediction."""
+    results: List[BatchPredictionItem] = Field(..., description="Per-record results in request order")
+    total: int = Field(..., description="Number of records received")
+    succeeded: int = Field(..., description="Number of records scored")
+    failed: int = Field(..., description="Number of records rejected")
+
+# pydantic 2 and pydantic 1 are both supported; they differ in field
+# introspection, error details and which text they accept as an int
+PYDANTIC_V2 = hasattr(BaseModel, 'model_fields')
+
+# Numeric text the columnar validator converts itself; anything else is left to
+# pydantic (only pydantic 2 reads "4.0" as an int)
+if PYDANTIC_V2:
+    INT_LITERAL = re.compile(r'-?(0|[1-9][0-9]{0,15})(\.0{1,17})?')
+else:
+    INT_LITERAL = re.compile(r'-?(0|[1-9][0-9]{0,15})')
+FLOAT_LITERAL = re.compile(r'-?(0|[1-9][0-9]{0,15})(\.[0-9]{1,17})?')
+
+# Normalizers for string fields, applied to each distinct value of a column
+CATEGORICAL_NORMALIZERS = {
+    'sex': normalize_sex,
+    'genotype': normalize_genotype,
+    'hydration_level': normalize_hydration
+}
+
+def get_field_constraints(model):
+    """Return (name, type, {'ge'/'le'/'gt'/'lt': bound}) for each field of a pydantic model."""
+    constraints = []
+    if PYDANTIC_V2:
+        for name, field in model.model_fields.items():
+            bounds = {}
+            for item in field.metadata:
+                for op in ('ge', 'le', 'gt', 'lt'):
+                    if getattr(item, op, None) is not None:
+                        bounds[op] = getattr(item, op)
+            constraints.append((name, field.annotation, bounds))
+    else:
+        # outer_type_ is a generated subclass (ConstrainedIntValue) when bounds are set
+        hints = get_type_hints(model)
+        for name, field in model.__fields__.items():
+            bounds = {
+                op: getattr(field.field_info, op) for op in ('ge', 'le', 'gt', 'lt')
+                if getattr(field.field_info, op, None) is not None
+            }
+            constraints.append((name, hints.get(name, field.outer_type_), bounds))
+    return constraints
+
+class PatientRow:
+    """Attribute view of one row of a PatientBatch, standing in for PatientData."""
+    
+    __slots__ = ('batch', 'position')
+    
+    def __init__(self, batch, position):
+        self.batch = batch
+        self.position = position
+    
+    def __getattr__(self, name):
+        try:
+            return self.batch.columns[name][self.position]
+        except KeyError:
+            raise AttributeError(name)
+
+class PatientBatch:
+    """Validated patients held as one NumPy array per API field.
+    
+    Numeric fields are float arrays and string fields hold the normalized
+    values, i.e. what PatientData would have stored.
+    """
+    
+    def __init__(self, columns, size):
+        self.columns = columns
+        self.size = size
+    
+    def __len__(self):
+        return self.size
+    
+    @classmethod
+    def from_patients(cls, patients):
+        """Build a batch from PatientData objects."""
+        columns = {}
+        for name, annotation, _ in get_field_constraints(PatientData):
+            values = [getattr(patient, name) for patient in patients]
+            columns[name] = np.array(values, dtype=str if annotation is str else float)
+        return cls(columns, len(patients))
+    
+    @classmethod
+    def concat(cls, batches):
+        """Join batches row-wise, in the order given."""
+        names = batches[0].columns.keys()
+        columns = {name: np.concatenate([batch.columns[name] for batch in batches]) for name in names}
+        return cls(columns, sum(len(batch) for batch in batches))
+    
+    def take(self, positions):
+        """Return a batch holding the given rows."""
+        positions = np.asarray(positions, dtype=np.intp)
+        return PatientBatch({name: values[positions] for name, values in self.columns.items()}, len(positions))
+    
+    def row(self, position):
+        return PatientRow(self, position)
+    
+    def training_columns(self):
+        """Return the columns under their training names, as patients_to_columns does."""
+        return {model_field: self.columns[api_field] for api_field, model_field in FIELD_MAPPING.items()}
+
+class ColumnRecords:
+    """Rows of a columnar request body (e.g. Arrow IPC), kept as one array per field.
+    
+    The columnar validator reads the arrays directly; indexing builds the
+    record dict of a single row, which is only needed for rows that go
+    through PatientData. Missing values (None or NaN) are left out of it.
+    """
+    
+    def __init__(self, columns, size):
+        self.columns = columns
+        self.size = size
+    
+    def __len__(self):
+        return self.size
+    
+    def __getitem__(self, row):
+        record = {}
+        for name, values in self.columns.items():
+            value = values[row]
+            if value is None or (isinstance(value, (float, np.floating)) and np.isnan(value)):
+                continue
+            record[name] = value.item() if isinstance(value, np.generic) else value
+        return record
+    
+    def __iter__(self):
+        for row in range(self.size):
+            yield self[row]
+
+class ColumnarValidator:
+    """Checks many records against a pydantic model's declared fields at once.
+    
+    Each field is pulled out as a column, type-checked, and range-checked
+    with NumPy masks against the model's ge/le/gt/lt constraints; string
+    fields go through CATEGORICAL_NORMALIZERS once per distinct value. Only
+    plainly valid values pass: a row with a missing field, a value of
+    another type (e.g. "5" or true for an int) or anything out of range is
+    left for the pydantic model, which coerces or rejects it exactly as for
+    single requests.
+    
+    Columns that arrive as arrays (validate_columns) skip the per-row
+    extraction; numeric arrays are checked without leaving NumPy.
+    """
+    
+    def __init__(self, model, normalizers):
+        self.fields = get_field_constraints(model)
+        self.normalizers = normalizers
+    
+    def validate(self, records):
+        """Return (mask of rows that passed, {field: array}) for a list of dicts."""
+        columns = {name: [record.get(name) for record in records] for name, _, _ in self.fields}
+        return self.validate_columns(columns, len(records))
+    
+    def validate_columns(self, columns, n):
+        """Return (mask of rows that passed, {field: array}) for lists or arrays of field values.
         
-        model_path = os.path.join(script_dir, 'enhanced_sickle_cell_model.pkl')
+        A field without a column fails every row. In a float array, NaN
+        stands for a missing value and an int field takes whole numbers.
+        """
+        passed = np.ones(n, dtype=bool)
+        validated = {}
+        for name, annotation, bounds in self.fields:
+            values = columns.get(name)
+            if values is None:
+                values = [None] * n
+            elif isinstance(values, np.ndarray):
+                if annotation is not str and values.dtype.kind in 'iuf':
+                    array = values.astype(float)
+                    ok = np.isfinite(array)
+                    if annotation is int and values.dtype.kind == 'f':
+                        ok &= array == np.trunc(array)
+                    passed &= ok & self.within_bounds(array, bounds)
+                    validated[name] = array
+                    continue
+                values = values.tolist()
+            if annotation is str:
+                strings = [value if type(value) is str else None for value in values]
+                normalize = self.normalizers.get(name, lambda value: value)
+                lookup = {value: normalize(value) for value in set(strings) if value is not None}
+                normalized = [lookup.get(value) for value in strings]
+                ok = np.fromiter((value is not None for value in normalized), dtype=bool, count=n)
+                validated[name] = np.array([value if value is not None else '' for value in normalized], dtype=str)
+            else:
+                # bool is a subclass of int, but only real numbers take the fast path
+                allowed = (int,) if annotation is int else (int, float)
+                kinds = set(map(type, values))
+                if str in kinds:
+                    # CSV uploads carry numbers as text; plain decimal literals convert as the model would
+                    if annotation is int:
+                        pattern, convert = INT_LITERAL, lambda value: int(value.split('.')[0])
+                    else:
+                        pattern, convert = FLOAT_LITERAL, float
+                    parsed = {
+                        value: convert(value) for value in set(value for value in values if type(value) is str)
+                        if pattern.fullmatch(value)
+                    }
+                    values = [parsed.get(value, np.nan) if type(value) is str else value for value in values]
+                    kinds = set(map(type, values))
+                if kinds.issubset(allowed):
+                    ok = np.ones(n, dtype=bool)
+                else:
+                    ok = np.fromiter((type(value) in allowed for value in values), dtype=bool, count=n)
+                    values = [value if good else np.nan for value, good in zip(values, ok)]
+                try:
+                    array = np.array(values, dtype=float)
+                except OverflowError:
+                    array = np.full(n, np.nan)
+                    ok = np.zeros(n, dtype=bool)
+                # NaN and infinities are left to the model to accept or reject
+                ok &= np.isfinite(array) & self.within_bounds(array, bounds)
+                validated[name] = array
+            passed &= ok
+        return passed, validated
+    
+    @staticmethod
+    def within_bounds(array, bounds):
+        """Return the mask of values inside a field's ge/gt/le/lt bounds."""
+        ok = np.ones(len(array), dtype=bool)
+        with np.errstate(invalid='ignore'):
+            if 'ge' in bounds:
+                ok &= array >= bounds['ge']
+            if 'gt' in bounds:
+                ok &= array > bounds['gt']
+            if 'le' in bounds:
+                ok &= array <= bounds['le']
+            if 'lt' in bounds:
+                ok &= array < bounds['lt']
+        return ok
+
+patient_validator = ColumnarValidator(PatientData, CATEGORICAL_NORMALIZERS)
+
+def get_model_dir():
+    """Return the directory holding the model artifacts."""
+    # Check if running as PyInstaller executable
+    if getattr(sys, 'frozen', False):
+        # Running as executable - model files are in the same directory as the executable
+        return sys._MEIPASS
+    # Running as script - model files are in the same directory as the script
+    return os.path.dirname(os.path.abspath(__file__))
+
+class UnknownModelError(Exception):
+    """Raised when a request names a model that is not in MODEL_ARTIFACTS."""
+
+def parse_model_key(key):
+    """Split "name" or "name@version" into a (name, version) pair."""
+    name, _, version = key.partition('@')
+    version = version or 'latest'
+    if name not in MODEL_ARTIFACTS or not re.fullmatch(r'[A-Za-z0-9_-]+', version):
+        raise UnknownModelError(f"Unknown model '{key}'. Available: {', '.join(MODEL_ARTIFACTS)}")
+    return name, version
+
+def canonical_model_key(key=None):
+    """Normalize a model key so "enhanced" and "enhanced@latest" match."""
+    name, version = parse_model_key(key or DEFAULT_MODEL)
+    return f"{name}@{version}"
+
+def get_model_path(key=None):
+    """Return the artifact path for a model key."""
+    name, version = parse_model_key(key or DEFAULT_MODEL)
+    stem = MODEL_ARTIFACTS[name]
+    filename = f"{stem}.pkl" if version == 'latest' else f"{stem}_{version}.pkl"
+    return os.path.join(get_model_dir(), filename)
+
+def list_available_models():
+    """List the model keys that have a pickle or pickle-free artifact on disk."""
+    available = []
+    filenames = set(os.listdir(get_model_dir()))
+    for name, stem in MODEL_ARTIFACTS.items():
+        if f"{stem}.pkl" in filenames or f"{stem}.npz" in filenames:
+            available.append(f"{name}@latest")
+        versions = set()
+        for filename in filenames:
+            match = re.fullmatch(re.escape(stem) + r'_([A-Za-z0-9_-]+)\.(?:pkl|npz)', filename)
+            if match:
+                versions.add(match.group(1))
+        available.extend(f"{name}@{version}" for version in sorted(versions))
+    return available
+
+class PredictionCache:
+    """LRU cache of prediction responses with a time-to-live.
+    
+    Keys combine the model key, the runtime generation and a digest of the
+    validated PatientData, so a swapped model can never serve a stale entry;
+    entries of a replaced model are also dropped eagerly to free memory.
+    """
+    
+    def __init__(self, capacity, ttl):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    @property
+    def enabled(self):
+        return self.capacity > 0
+    
+    @staticmethod
+    def make_key(runtime, patient_data):
+        """Build a stable key from the model and the normalized patient values."""
+        canonical = json.dumps(patient_data.dict(), sort_keys=True, separators=(',', ':'))
+        digest = hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+        return (runtime.model_key, runtime.generation, digest)
+    
+    def get(self, key):
+        """Return a cached response, or None on a miss or an expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, response, size = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+    
+    def put(self, key, response, rendered_size):
+        """Store a response, evicting the least recently used entries if full.
+        
+        ``rendered_size`` is the length of the body already rendered for the
+        client; it stands in for the entry's footprint, so the response is
+        not serialized a second time just to be measured.
+        """
+        size = len(key[2]) + rendered_size
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (time.monotonic() + self.ttl, response, size)
+            self._bytes += size
+            while len(self._entries) > self.capacity:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+    
+    def invalidate_model(self, model_key):
+        """Drop every entry produced by a model key."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == model_key]
+            for key in stale:
+                self._bytes -= self._entries.pop(key)[2]
+            self.invalidations += len(stale)
+    
+    def stats(self):
+        """Return counters and the approximate memory footprint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "capacity": self.capacity,
+                "ttl_seconds": self.ttl,
+                "entries": len(self._entries),
+                "approx_bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+class ModelRegistry:
+    """Model runtimes loaded on first use, keeping the most recently used resident.
+    
+    Entries are replaced atomically by put(), so a reload never disturbs a
+    request that already holds the previous runtime.
+    """
+    
+    def __init__(self, capacity):
+        self.capacity = max(1, capacity)
+        self._runtimes = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = defaultdict(threading.Lock)
+    
+    def get(self, key):
+        """Return a resident runtime and mark it most recently used, or None."""
+        with self._lock:
+            runtime = self._runtimes.get(key)
+            if runtime is not None:
+                self._runtimes.move_to_end(key)
+            return runtime
+    
+    def contains(self, key):
+        """Check residency without touching the LRU order."""
+        with self._lock:
+            return key in self._runtimes
+    
+    def put(self, key, runtime):
+        """Insert or replace a runtime and return the one it replaced."""
+        evicted_keys = []
+        with self._lock:
+            previous = self._runtimes.pop(key, None)
+            self._runtimes[key] = runtime
+            while len(self._runtimes) > self.capacity:
+                evicted_key, _ = self._runtimes.popitem(last=False)
+                evicted_keys.append(evicted_key)
+                logger.info(f"Evicted model {evicted_key} from memory")
         
-        model_package = joblib.load(model_path)
-        logger.info(f"Model loaded successfully from {model_path}")
+        # Cached predictions of a replaced or evicted model are never served again
+        if previous is not None:
+            prediction_cache.invalidate_model(key)
+        for evicted_key in evicted_keys:
+            prediction_cache.invalidate_model(evicted_key)
+        return previous
+    
+    def load(self, key):
+        """Return the runtime for a canonical key, loading it on first use."""
+        runtime = self.get(key)
+        if runtime is not None:
+            return runtime
+        
+        # One loader per key; concurrent callers wait for it instead of loading twice
+        with self._lock:
+            load_lock = self._load_locks[key]
+        with load_lock:
+            runtime = self.get(key)
+            if runtime is None:
+                runtime = build_model_runtime(get_model_path(key), key)
+                self.put(key, runtime)
+                logger.info(f"Model {key} loaded from {runtime.source_path}")
+                if runtime.fused_scorer is not None:
+                    logger.info(f"Compiled fused linear scorer for model {key}")
+                else:
+                    logger.info(f"Model {key} cannot be fused; using the sklearn pipeline")
+            return runtime
+    
+    def resident(self):
+        """Return resident runtimes, least recently used first."""
+        with self._lock:
+            return list(self._runtimes.values())
+
+model_registry = ModelRegistry(MODEL_CACHE_SIZE)
+
+def load_model_package(model_path):
+    """Unpickle a model package.
+    
+    joblib (and sklearn, which the pickle pulls in along with pandas) is
+    imported here rather than at module level, so the server can start and
+    serve from a model state without paying for those imports.
+    """
+    import joblib
+    return joblib.load(model_path)
+
+def load_model_state(model_path):
+    """Load the state of a model, preferring its pickle-free artifact.
+    
+    The .npz artifact next to the pickle is used when it was exported from
+    that exact pickle (or when only the artifact is deployed); otherwise the
+    pickle is loaded. Returns (state, package), package being None for an
+    artifact.
+    """
+    artifact_path = get_artifact_path(model_path)
+    if os.path.exists(artifact_path):
+        try:
+            state, _ = load_model_artifact(artifact_path, model_path)
+            logger.info(f"Loaded pickle-free model artifact {artifact_path}")
+            return state, None
+        except ArtifactMismatchError as e:
+            logger.warning(f"{str(e)}; loading the pickle instead")
+    
+    package = load_model_package(model_path)
+    return extract_model_state(package), package
+
+def get_model_source_path(model_path):
+    """Return the file a model is loaded from: the pickle, or its artifact when deployed alone."""
+    artifact_path = get_artifact_path(model_path)
+    if not os.path.exists(model_path) and os.path.exists(artifact_path):
+        return artifact_path
+    return model_path
+
+def build_model_runtime(model_path, model_key=None):
+    """Load a model from disk and smoke test it.
+    
+    When a shared state exported from the same artifact is available (see
+    SHARED_MODEL_DIR) it is memory-mapped; otherwise the pickle-free
+    artifact or, failing that, the pickle is loaded. Raises if the model
+    cannot be loaded or does not produce a sane prediction, so a broken
+    file never replaces a working model.
+    """
+    started = time.perf_counter()
+    source_path = get_model_source_path(model_path)
+    model_mtime = os.path.getmtime(source_path)
+    runtime = None
+    
+    shared_path = get_shared_state_path(model_key)
+    if shared_path and os.path.exists(os.path.join(shared_path, 'manifest.json')):
+        state, manifest = attach_model_state(shared_path)
+        if manifest.get('source_mtime') == model_mtime:
+            runtime = ModelRuntime(state, model_key=model_key, source_path=source_path, source_mtime=model_mtime)
+            logger.info(f"Attached shared model state for {model_key} from {shared_path}")
+    
+    if runtime is None:
+        state, package = load_model_state(model_path)
+        runtime = ModelRuntime(
+            state, package,
+            model_key=model_key, source_path=source_path, source_mtime=model_mtime
+        )
+    
+    X, probabilities = score_patients(runtime, [PatientData(**SMOKE_TEST_PATIENT)])
+    if not (0.0 <= probabilities[0] <= 1.0):
+        raise ValueError(f"Smoke prediction returned {probabilities[0]!r}")
+    build_prediction_response(
+        runtime, probabilities[0], PatientData(**SMOKE_TEST_PATIENT), get_top_risk_factors(runtime, X[0])
+    )
+    
+    if model_key is not None:
+        MODEL_LOAD_SECONDS.set(model_key, value=time.perf_counter() - started)
+        MODEL_LOADS_TOTAL.inc(model_key)
+    return runtime
+
+def load_model():
+    """Load the default model package."""
+    try:
+        model_registry.load(canonical_model_key())
         return True
     except FileNotFoundError:
         logger.error("Model file not found. Please train the model first.")
@@ -140,6 +993,64 @@ def load_model():
         logger.error(f"Error loading model: {str(e)}")
         return False
 
+async def get_model_runtime(key=None):
+    """Return the runtime for a model key, loading it off the event loop if needed."""
+    key = canonical_model_key(key)
+    runtime = model_registry.get(key)
+    if runtime is None:
+        loop = asyncio.get_running_loop()
+        runtime = await loop.run_in_executor(None, model_registry.load, key)
+        note_model_loaded(runtime)
+    return runtime
+
+async def reload_model(key=None):
+    """Load a model artifact again in the background and swap it in.
+    
+    The new model is loaded and smoke tested on a worker thread while the
+    current model keeps serving; the swap only happens once it passed.
+    Concurrent reloads are serialized.
+    """
+    key = canonical_model_key(key)
+    async with model_reload_lock:
+        model_path = get_model_path(key)
+        loop = asyncio.get_running_loop()
+        runtime = await loop.run_in_executor(None, build_model_runtime, model_path, key)
+        previous = model_registry.put(key, runtime)
+        logger.info(
+            f"Model {key} reloaded from {model_path}: "
+            f"{previous.model_version if previous else 'none'} -> {runtime.model_version}"
+        )
+        note_model_loaded(runtime)
+        return runtime
+
+async def watch_model_file():
+    """Reload resident models whenever their file modification time changes."""
+    logger.info(f"Watching resident model files for changes every {MODEL_WATCH_INTERVAL}s")
+    
+    while True:
+        await asyncio.sleep(MODEL_WATCH_INTERVAL)
+        for runtime in model_registry.resident():
+            try:
+                mtime = os.path.getmtime(runtime.source_path)
+            except OSError:
+                continue
+            if mtime == runtime.source_mtime:
+                continue
+            
+            # Wait one more interval so a file that is still being written settles
+            await asyncio.sleep(MODEL_WATCH_INTERVAL)
+            try:
+                if os.path.getmtime(runtime.source_path) != mtime:
+                    continue
+                await reload_model(runtime.model_key)
+            except Exception as e:
+                logger.error(
+                    f"Model file {runtime.source_path} changed but reload failed, "
+                    f"keeping current model: {str(e)}"
+                )
+                # Remember the bad mtime so the same broken file is not retried forever
+                runtime.source_mtime = mtime
+
 def create_advanced_features(df):
     """Create the same advanced features used during training."""
     # Pain-related interaction features
@@ -184,6 +1095,235 @@ def create_advanced_features(df):
     
     return df
 
+class FusedLinearScorer:
+    """Imputer, scaler, feature selector and logistic regression folded together.
+    
+    Median imputation, standard scaling, the SelectKBest mask and the logistic
+    regression are all affine, so the whole package reduces to a fill vector
+    for missing values, one weight per engineered feature and a bias. Scoring
+    is then a single dot product over plain NumPy arrays.
+    """
+    
+    def __init__(self, feature_names, fill_values, weights, bias, label_classes):
+        self.feature_names = list(feature_names)
+        self.fill_values = np.asarray(fill_values, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.bias = float(bias)
+        # LabelEncoder classes are sorted, which lets encode() use searchsorted
+        self.label_classes = {col: np.asarray(classes).astype(str) for col, classes in label_classes.items()}
+    
+    @classmethod
+    def from_state(cls, state):
+        """Fold the imputer, scaler, selector and coefficients of a model state."""
+        support = np.asarray(state['support'], dtype=bool)
+        scale = np.asarray(state['scale'], dtype=float)
+        mean = np.asarray(state['mean'], dtype=float)
+        
+        # logit = coef . ((x - mean) / scale)[support] + intercept
+        weights = np.zeros(len(state['feature_names']))
+        weights[support] = np.asarray(state['coef'], dtype=float) / scale[support]
+        bias = state['intercept'] - np.dot(weights[support], mean[support])
+        
+        return cls(state['feature_names'], state['fill_values'], weights, bias, state['label_classes'])
+    
+    def encode(self, col, values):
+        """Map category strings to label-encoder codes."""
+        classes = self.label_classes[col]
+        values = np.asarray(values).astype(str)
+        codes = np.minimum(np.searchsorted(classes, values), len(classes) - 1)
+        unseen = classes[codes] != values
+        if unseen.any():
+            raise ValueError(f"y contains previously unseen labels: {str(values[unseen][0])!r}")
+        return codes
+    
+    def feature_matrix(self, columns):
+        """Engineer and encode raw input columns into an N x F feature matrix."""
+        started = time.perf_counter()
+        n_rows = len(next(iter(columns.values())))
+        features = create_advanced_features(dict(columns))
+        started = record_stage('features', started)
+        
+        for col in CATEGORICAL_COLUMNS:
+            if col in features and col in self.label_classes:
+                features[col] = self.encode(col, features[col])
+        
+        # Features the inputs cannot provide default to 0, as in the pipeline path
+        X = np.column_stack([
+            np.broadcast_to(np.asarray(features.get(name, 0), dtype=float), (n_rows,))
+            for name in self.feature_names
+        ])
+        record_stage('encoding', started)
+        return X
+    
+    def predict_proba(self, X):
+        """Return the crisis probability for every row of a feature matrix.
+        
+        Imputation, scaling and selection are folded into the weights, so
+        the whole model is recorded as the predict_proba stage.
+        """
+        started = time.perf_counter()
+        X = np.where(np.isnan(X), self.fill_values, X)
+        logit = X @ self.weights + self.bias
+        # Numerically stable logistic function
+        probabilities = np.exp(-np.logaddexp(0.0, -logit))
+        record_stage('predict_proba', started)
+        return probabilities
+
+def compile_fused_scorer(state, package=None):
+    """Build a FusedLinearScorer from a model state.
+    
+    Returns None when the state has no linear part. When the sklearn package
+    is available, the folded scorer is also checked against its pipeline on
+    a probe batch and rejected if they disagree.
+    """
+    if 'coef' not in state:
+        return None
+    
+    try:
+        scorer = FusedLinearScorer.from_state(state)
+        
+        if package is not None:
+            import pandas as pd
+            probe = build_probe_columns(state)
+            _, expected = score_frame_with_pipeline(package, pd.DataFrame(probe))
+            actual = scorer.predict_proba(scorer.feature_matrix(probe))
+            if not np.allclose(actual, expected, rtol=FUSED_SCORER_TOLERANCE, atol=FUSED_SCORER_TOLERANCE):
+                logger.warning("Fused scorer disagrees with the sklearn pipeline; not using it")
+                return None
+        
+        return scorer
+    except (AttributeError, KeyError, ValueError) as e:
+        logger.warning(f"Could not compile fused scorer: {str(e)}")
+        return None
+
+runtime_generations = itertools.count(1)
+
+class ModelRuntime:
+    """A loaded model plus everything derived from it at load time.
+    
+    Column orders, encoder lookups and the importance ranking do not depend
+    on the request, so they are computed once here and handlers only do
+    per-patient work. A runtime is built from a model state; the sklearn
+    package is optional and only needed when the state cannot be fused.
+    """
+    
+    def __init__(self, state, package=None, model_key=None, source_path=None, source_mtime=None):
+        self.package = package
+        self.model_key = model_key
+        self.source_path = source_path
+        self.source_mtime = source_mtime
+        self.loaded_at = datetime.now().isoformat()
+        self.generation = next(runtime_generations)
+        self.model_info = state['model_info']
+        self.model_version = self.model_info.get('best_model', 'Unknown')
+        self.model_type = state['model_type']
+        
+        self.feature_names = list(state['feature_names'])
+        
+        # Categories each label encoder knows
+        self.label_lookup = {
+            col: frozenset(str(label) for label in classes)
+            for col, classes in state['label_classes'].items()
+        }
+        
+        # Positions of the selected features in the full feature matrix
+        self.selected_indices = np.flatnonzero(state['support'])
+        
+        # Most important selected features, strongest first
+        importance = np.asarray(state['importance'], dtype=float)
+        order = np.argsort(-importance, kind='stable')[:TOP_IMPORTANCE_FEATURES]
+        self.importance_indices = self.selected_indices[order]
+        self.importance_values = importance[order]
+        
+        # Explanation terms: contribution = coef * (x - mean) / scale over the
+        # selected features, which sums with the intercept to the logit. Models
+        # without a linear part fall back to importance times the raw value.
+        if 'coef' in state:
+            self.explain_indices = self.selected_indices
+            self.explain_fill = np.asarray(state['fill_values'], dtype=float)[self.explain_indices]
+            self.explain_mean = np.asarray(state['mean'], dtype=float)[self.explain_indices]
+            self.explain_scale = np.asarray(state['scale'], dtype=float)[self.explain_indices]
+            self.explain_coef = np.asarray(state['coef'], dtype=float)
+        else:
+            self.explain_indices = self.importance_indices
+            self.explain_fill = np.zeros(len(self.explain_indices))
+            self.explain_mean = np.zeros(len(self.explain_indices))
+            self.explain_scale = np.ones(len(self.explain_indices))
+            self.explain_coef = self.importance_values
+        self.explain_display_names = [
+            self.feature_names[i].replace('_', ' ').title() for i in self.explain_indices
+        ]
+        
+        self.fused_scorer = compile_fused_scorer(state, package)
+        if self.fused_scorer is None and package is None:
+            raise ValueError("Model state has no linear part and no sklearn package to fall back on")
+
+def build_probe_columns(state, n_rows=8):
+    """Build synthetic raw input columns around the training medians."""
+    feature_names = list(state['feature_names'])
+    statistics = state['fill_values']
+    scales = np.linspace(0.25, 2.0, n_rows)
+    
+    columns = {}
+    for col in FIELD_MAPPING.values():
+        if col in CATEGORICAL_COLUMNS:
+            classes = state['label_classes'].get(col) or ['']
+            columns[col] = np.array([classes[i % len(classes)] for i in range(n_rows)])
+        elif col in feature_names:
+            columns[col] = statistics[feature_names.index(col)] * scales
+        else:
+            columns[col] = scales
+    return columns
+
+def get_shared_state_path(model_key):
+    """Return where the shared state of a model lives, or None when not sharing."""
+    if not SHARED_MODEL_DIR or model_key is None:
+        return None
+    return os.path.join(SHARED_MODEL_DIR, model_key.replace('@', '-'))
+
+def export_model_state(state, directory, source_path=None, source_mtime=None):
+    """Write a model state as one .npy file per array plus a JSON manifest.
+    
+    The manifest is written last, through a rename, so readers never see a
+    half-written export.
+    """
+    os.makedirs(directory, exist_ok=True)
+    arrays = [name for name in MODEL_STATE_ARRAYS if name in state]
+    for name in arrays:
+        np.save(os.path.join(directory, f"{name}.npy"), np.asarray(state[name]))
+    
+    manifest = {
+        'arrays': arrays,
+        'feature_names': list(state['feature_names']),
+        'label_classes': state['label_classes'],
+        'model_info': state['model_info'],
+        'model_type': state['model_type'],
+        'intercept': state.get('intercept'),
+        'source_path': source_path,
+        'source_mtime': source_mtime
+    }
+    manifest_path = os.path.join(directory, 'manifest.json')
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, default=json_default)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+def attach_model_state(directory):
+    """Open an exported model state read-only, memory-mapping its arrays."""
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        manifest = json.load(f)
+    
+    state = {
+        'feature_names': manifest['feature_names'],
+        'label_classes': manifest['label_classes'],
+        'model_info': manifest['model_info'],
+        'model_type': manifest['model_type']
+    }
+    if manifest.get('intercept') is not None:
+        state['intercept'] = manifest['intercept']
+    for name in manifest['arrays']:
+        state[name] = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+    return state, manifest
+
 def get_risk_level(probability):
     """Determine risk level based on probability."""
     if probability < 0.3:
@@ -202,25 +1342,39 @@ def get_confidence_level(probability):
     else:
         return "Moderate"
 
-def get_top_risk_factors(patient_df, feature_importance):
-    """Get top contributing risk factors for this patient."""
-    risk_factors = []
+def explain_contributions(runtime, X, k=TOP_RISK_FACTORS):
+    """Compute the top-k signed contributions for every row of a feature matrix.
     
-    # Get feature values for the patient
-    for _, row in feature_importance.iterrows():
-        feature_name = row['feature']
-        importance = row['importance']
-        
-        if feature_name in patient_df.columns:
-            value = patient_df[feature_name].iloc[0]
-            risk_factors.append(RiskFactor(
-                factor=feature_name.replace('_', ' ').title(),
-                contribution=float(importance * value)
-            ))
+    Returns (positions, contributions), both N x k and ordered strongest
+    first; positions index ``runtime.explain_display_names``.
+    """
+    values = X[:, runtime.explain_indices]
+    values = np.where(np.isnan(values), runtime.explain_fill, values)
+    contributions = runtime.explain_coef * (values - runtime.explain_mean) / runtime.explain_scale
     
-    # Sort by contribution and return top 5
-    risk_factors.sort(key=lambda x: abs(x.contribution), reverse=True)
-    return risk_factors[:5]
+    k = min(k, contributions.shape[1])
+    magnitude = -np.abs(contributions)
+    positions = np.argpartition(magnitude, k - 1, axis=1)[:, :k]
+    # argpartition leaves the k strongest unordered; sort just those
+    order = np.argsort(np.take_along_axis(magnitude, positions, axis=1), axis=1, kind='stable')
+    positions = np.take_along_axis(positions, order, axis=1)
+    return positions, np.take_along_axis(contributions, positions, axis=1)
+
+def explain_predictions(runtime, X):
+    """Get the top contributing risk factors for every scored patient."""
+    started = time.perf_counter()
+    positions, contributions = explain_contributions(runtime, X)
+    names = runtime.explain_display_names
+    factors = [
+        [RiskFactor(factor=names[i], contribution=c) for i, c in zip(row_positions, row_contributions)]
+        for row_positions, row_contributions in zip(positions.tolist(), contributions.tolist())
+    ]
+    record_stage('explanation', started)
+    return factors
+
+def get_top_risk_factors(runtime, feature_row):
+    """Get top contributing risk factors for this patient."""
+    return explain_predictions(runtime, feature_row[np.newaxis, :])[0]
 
 def get_recommendations(probability, patient_data):
     """Generate clinical recommendations based on risk level."""
@@ -259,12 +1413,737 @@ def get_recommendations(probability, patient_data):
     
     return recommendations
 
+def format_validation_error(error):
+    """Flatten a pydantic ValidationError into a single readable line."""
+    messages = []
+    for detail in error.errors():
+        location = '.'.join(str(part) for part in detail.get('loc', ()))
+        messages.append(f"{location}: {detail.get('msg')}" if location else detail.get('msg'))
+    return '; '.join(messages)
+
+def validate_records(records, count_rows=True):
+    """Validate raw batch records into a PatientBatch plus per-record errors.
+    
+    Returns (batch, indices, errors): row ``i`` of the batch is record
+    ``indices[i]``, and ``errors[index]`` holds the message of each record
+    that was rejected. Records that pass the columnar checks skip PatientData
+    entirely; the rest are parsed one by one, so their errors read exactly
+    as for a single request. A record that is an Exception (e.g. an
+    unparseable line) is rejected with that error. ``records`` may also be
+    ColumnRecords, whose arrays are validated without building the rows.
+    ``count_rows=False`` leaves the records out of VALIDATION_ROWS.
+    """
+    started = time.perf_counter()
+    errors = [None] * len(records)
+    if isinstance(records, ColumnRecords):
+        dict_indices = range(len(records))
+        passed, columns = patient_validator.validate_columns(records.columns, len(records))
+    else:
+        dict_indices = [index for index, record in enumerate(records) if type(record) is dict]
+        passed, columns = patient_validator.validate([records[index] for index in dict_indices])
+    fast_indices = [dict_indices[i] for i in np.flatnonzero(passed)]
+    
+    slow_indices = []
+    slow_patients = []
+    fast = set(fast_indices)
+    for index in range(len(records)):
+        if index in fast:
+            continue
+        record = records[index]
+        if isinstance(record, Exception):
+            errors[index] = str(record)
+            continue
+        try:
+            slow_patients.append(PatientData.parse_obj(record))
+            slow_indices.append(index)
+        except ValidationError as e:
+            errors[index] = format_validation_error(e)
+    
+    batch = PatientBatch({name: values[passed] for name, values in columns.items()}, len(fast_indices))
+    if slow_patients:
+        batch = PatientBatch.concat([batch, PatientBatch.from_patients(slow_patients)])
+    if count_rows:
+        VALIDATION_ROWS.inc('columnar', amount=len(fast_indices))
+        VALIDATION_ROWS.inc('model', amount=len(records) - len(fast_indices))
+    record_stage('validation', started)
+    return batch, fast_indices + slow_indices, errors
+
+def patients_to_dataframe(patients):
+    """Build an N-row DataFrame with training column names from validated patients."""
+    # Only the sklearn fallback path needs pandas
+    import pandas as pd
+    started = time.perf_counter()
+    if isinstance(patients, PatientBatch):
+        patient_df = pd.DataFrame(patients.training_columns())
+        record_stage('field_mapping', started)
+        return patient_df
+    rows = []
+    for patient in patients:
+        patient_dict = patient.dict()
+        rows.append({
+            model_field: patient_dict[api_field]
+            for api_field, model_field in FIELD_MAPPING.items()
+            if api_field in patient_dict
+        })
+    patient_df = pd.DataFrame(rows)
+    record_stage('field_mapping', started)
+    return patient_df
+
+def patients_to_columns(patients):
+    """Build one NumPy array per training column from validated patients."""
+    if isinstance(patients, PatientBatch):
+        return patients.training_columns()
+    started = time.perf_counter()
+    columns = {}
+    for api_field, model_field in FIELD_MAPPING.items():
+        values = [getattr(patient, api_field) for patient in patients]
+        if model_field in CATEGORICAL_COLUMNS:
+            columns[model_field] = np.array([str(value) for value in values])
+        else:
+            columns[model_field] = np.array(values, dtype=float)
+    record_stage('field_mapping', started)
+    return columns
+
+def find_unseen_labels(runtime, patients):
+    """Return a per-row error message for categories unknown to the label encoders."""
+    errors = [None] * len(patients)
+    for api_field, model_field in FIELD_MAPPING.items():
+        if model_field in CATEGORICAL_COLUMNS and model_field in runtime.label_lookup:
+            known = runtime.label_lookup[model_field]
+            if isinstance(patients, PatientBatch):
+                values = patients.columns[api_field]
+                for i in np.flatnonzero(~np.isin(values, list(known))):
+                    if errors[i] is None:
+                        errors[i] = f"{model_field}: unseen label '{values[i]}'"
+                continue
+            for i, patient in enumerate(patients):
+                value = str(getattr(patient, api_field))
+                if value not in known and errors[i] is None:
+                    errors[i] = f"{model_field}: unseen label '{value}'"
+    return errors
+
+def score_frame_with_pipeline(package, patient_df):
+    """Run feature engineering, encoding and the sklearn pipeline over every row.
+    
+    Returns the engineered (and encoded) frame alongside an array of crisis
+    probabilities, one per row.
+    """
+    started = time.perf_counter()
+    
+    # Create advanced features
+    patient_df = create_advanced_features(patient_df)
+    started = record_stage('features', started)
+    
+    # Apply label encoding for categorical variables
+    for col in CATEGORICAL_COLUMNS:
+        if col in patient_df.columns and col in package['label_encoders']:
+            patient_df[col] = package['label_encoders'][col].transform(patient_df[col].astype(str))
+    
+    # Ensure all features are present
+    for feature in package['feature_names']:
+        if feature not in patient_df.columns:
+            patient_df[feature] = 0
+    
+    # Select and order features
+    X = patient_df[package['feature_names']]
+    started = record_stage('encoding', started)
+    
+    # Preprocess and select features
+    X_processed = package['preprocessor'].transform(X)
+    started = record_stage('preprocessing', started)
+    if package.get('feature_selector') is not None:
+        X_processed = package['feature_selector'].transform(X_processed)
+        started = record_stage('selection', started)
+    
+    # Make prediction
+    probabilities = package['model'].predict_proba(X_processed)[:, 1]
+    record_stage('predict_proba', started)
+    
+    return patient_df, probabilities
+
+def score_patients(runtime, patients):
+    """Score validated patients (PatientData objects or a PatientBatch) in one pass.
+    
+    Returns the N x F matrix of engineered, encoded feature values (in
+    ``runtime.feature_names`` order) and the crisis probability for each
+    patient. The fused scorer is used when the package could be compiled;
+    otherwise the sklearn pipeline runs over a DataFrame.
+    """
+    if runtime.fused_scorer is not None:
+        X = runtime.fused_scorer.feature_matrix(patients_to_columns(patients))
+        return X, runtime.fused_scorer.predict_proba(X)
+    
+    patient_df, probabilities = score_frame_with_pipeline(runtime.package, patients_to_dataframe(patients))
+    return patient_df[runtime.feature_names].to_numpy(dtype=float), probabilities
+
+class ScoringQueueFull(Exception):
+    """Raised when the scoring pool already has its maximum number of jobs."""
+
+def init_scoring_worker():
+    """Preload the default model in a freshly started scoring process."""
+    load_model()
+
+def score_in_worker(model_key, source_mtime, patients):
+    """Score patients inside a scoring process with its own model registry.
+    
+    The parent passes the modification time of the artifact it is serving,
+    so a worker picks up a hot-reloaded model on its next job.
+    """
+    runtime = model_registry.load(model_key)
+    if runtime.source_mtime != source_mtime:
+        runtime = build_model_runtime(get_model_path(model_key), model_key)
+        model_registry.put(model_key, runtime)
+    return score_patients(runtime, patients)
+
+class ScoringPool:
+    """Runs score_patients on a thread or process pool, off the event loop.
+    
+    The number of queued plus running jobs is bounded; past that limit
+    callers get ScoringQueueFull instead of piling up behind a slow model.
+    Jobs that raise are counted as failed, not completed.
+    """
+    
+    def __init__(self, kind, workers, max_queue):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"Unknown scoring executor '{kind}' (use 'thread' or 'process')")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.executor = None
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+    
+    def start(self):
+        """Create the underlying executor."""
+        if self.kind == 'process':
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_scoring_worker
+            )
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scoring')
+        logger.info(f"Scoring on a {self.kind} pool with {self.workers} workers")
+    
+    def shutdown(self):
+        """Stop the executor, letting running jobs finish."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+    
+    async def run(self, runtime, patients):
+        """Score patients on the pool and return (X, probabilities)."""
+        if self.executor is None:
+            return score_patients(runtime, patients)
+        if self.in_flight >= self.max_queue:
+            self.rejected += 1
+            raise ScoringQueueFull(f"Scoring queue full ({self.max_queue} jobs)")
+        
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            if self.kind == 'process':
+                result = await loop.run_in_executor(
+                    self.executor, score_in_worker, runtime.model_key, runtime.source_mtime, patients
+                )
+            else:
+                result = await loop.run_in_executor(self.executor, score_patients, runtime, patients)
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        return result
+    
+    def stats(self):
+        """Return pool configuration and queue counters."""
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
+
+scoring_pool = ScoringPool(SCORING_EXECUTOR, SCORING_WORKERS, SCORING_QUEUE_SIZE)
+
+class MicroBatcher:
+    """Coalesces concurrent single-patient predictions into vectorized batches.
+    
+    A request that arrives while the server is idle is scored straight away.
+    Requests arriving within the window of a previous one join an open batch,
+    which is scored in one call on the scoring pool when the window closes
+    or the batch is full. Each caller gets back its own feature row and
+    probability.
+    """
+    
+    def __init__(self, window_ms, max_batch_size):
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self._pending = []
+        self._flush_handle = None
+        self._last_submit = float('-inf')
+        self._tasks = set()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.full_flushes = 0
+        self.window_flushes = 0
+        self.immediate_flushes = 0
+    
+    @property
+    def enabled(self):
+        return self.window > 0
+    
+    async def submit(self, runtime, patient_data):
+        """Queue one patient and wait for its (feature_row, probability)."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        now = loop.time()
+        idle = not self._pending and now - self._last_submit > self.window
+        self._last_submit = now
+        self._pending.append((runtime, patient_data, future))
+        
+        if idle:
+            self.immediate_flushes += 1
+            self._flush()
+        elif len(self._pending) >= self.max_batch_size:
+            self.full_flushes += 1
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush_window)
+        
+        return await future
+    
+    def _flush_window(self):
+        self._flush_handle = None
+        self.window_flushes += 1
+        self._flush()
+    
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        
+        # Requests for different models are scored separately
+        groups = OrderedDict()
+        for runtime, patient_data, future in batch:
+            groups.setdefault(id(runtime), (runtime, []))[1].append((patient_data, future))
+        
+        for runtime, entries in groups.values():
+            task = asyncio.ensure_future(self._score_group(runtime, entries))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    @staticmethod
+    async def _score_group(runtime, entries):
+        try:
+            X, probabilities = await scoring_pool.run(runtime, [patient_data for patient_data, _ in entries])
+        except ScoringQueueFull as e:
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except Exception:
+            # One bad row must not fail its neighbours: score each on its own
+            for patient_data, future in entries:
+                if future.done():
+                    continue
+                try:
+                    X, probabilities = await scoring_pool.run(runtime, [patient_data])
+                    future.set_result((X[0], probabilities[0]))
+                except Exception as e:
+                    future.set_exception(e)
+            return
+        
+        for row, (_, future) in enumerate(entries):
+            if not future.done():
+                future.set_result((X[row], probabilities[row]))
+    
+    def stats(self):
+        """Return batching counters and the current configuration."""
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "immediate_flushes": self.immediate_flushes,
+            "window_flushes": self.window_flushes,
+            "full_flushes": self.full_flushes,
+            "pending": len(self._pending)
+        }
+
+micro_batcher = MicroBatcher(BATCH_WINDOW_MS, BATCH_MAX_SIZE)
+
+async def score_patient(runtime, patient_data):
+    """Score one patient, through the micro-batcher when it is enabled."""
+    if micro_batcher.enabled:
+        return await micro_batcher.submit(runtime, patient_data)
+    X, probabilities = await scoring_pool.run(runtime, [patient_data])
+    return X[0], probabilities[0]
+
+def count_predictions(results):
+    """Count the predictions among BatchPredictionItems in PREDICTIONS_TOTAL."""
+    for item in results:
+        if item.prediction is not None:
+            PREDICTIONS_TOTAL.inc(item.prediction.risk_level)
+
+def build_prediction_response(runtime, probability, patient_data, top_risk_factors):
+    """Assemble the API response for one scored patient."""
+    risk_level = get_risk_level(probability)
+    return PredictionResponse(
+        crisis_probability=float(probability),
+        risk_level=risk_level,
+        confidence=get_confidence_level(probability),
+        top_risk_factors=top_risk_factors,
+        recommendations=get_recommendations(probability, patient_data),
+        model_version=runtime.model_version,
+        prediction_timestamp=datetime.now().isoformat()
+    )
+
+def import_wire_format(media_type, status_code):
+    """Import the optional library behind a binary media type.
+    
+    msgpack and pyarrow are only needed by clients that ask for them, so a
+    missing library is reported as 415 (request) or 406 (response).
+    """
+    try:
+        if media_type == MSGPACK_MEDIA_TYPE:
+            import msgpack
+            return msgpack
+        import pyarrow
+        import pyarrow.ipc
+        return pyarrow
+    except ImportError:
+        library = 'msgpack' if media_type == MSGPACK_MEDIA_TYPE else 'pyarrow'
+        raise HTTPException(
+            status_code=status_code,
+            detail=f"{media_type} is not available on this server ({library} is not installed)"
+        )
+
+def normalize_media_type(value):
+    """Strip parameters and map aliases to the canonical media type."""
+    media_type = value.split(';', 1)[0].strip().lower()
+    return MEDIA_TYPE_ALIASES.get(media_type, media_type)
+
+def parse_accept_header(value):
+    """Return the (media type, q-value) pairs of an Accept header in listed order.
+    
+    Types with q=0, which the client refuses, and malformed q-values are
+    left out.
+    """
+    accepted = []
+    for part in value.split(','):
+        if not part.strip():
+            continue
+        q = 1.0
+        for param in part.split(';')[1:]:
+            name, _, param_value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(param_value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.append((normalize_media_type(part), q))
+    return accepted
+
+def negotiate_media_type(request):
+    """Pick the response media type from the Accept header.
+    
+    The supported type with the highest q-value wins, ties going to the one
+    listed first; wildcards stand for JSON. A binary format whose library
+    is not installed gives way to the next acceptable type and is a 406
+    only when nothing else is acceptable. JSON is the default.
+    """
+    accepted = parse_accept_header(request.headers.get('accept', ''))
+    # sorted is stable, so equal q-values keep their listed order
+    unavailable = None
+    for media_type, _ in sorted(accepted, key=lambda pair: -pair[1]):
+        if media_type in (MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE):
+            try:
+                import_wire_format(media_type, 406)
+            except HTTPException as e:
+                unavailable = unavailable or e
+                continue
+            return media_type
+        if media_type in (JSON_MEDIA_TYPE, '*/*', 'application/*'):
+            return JSON_MEDIA_TYPE
+    if unavailable is not None:
+        raise unavailable
+    return JSON_MEDIA_TYPE
+
+def arrow_table_to_columns(table):
+    """Return one NumPy array per Arrow column.
+    
+    Numeric columns without nulls are viewed in place rather than copied;
+    nulls become NaN (numeric) or None (other types).
+    """
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        if column.num_chunks == 1 and column.null_count == 0:
+            columns[name] = column.chunk(0).to_numpy(zero_copy_only=False)
+        else:
+            columns[name] = column.to_numpy()
+    return columns
+
+async def read_request_body(request, single=False):
+    """Decode a JSON, MessagePack or Arrow IPC request body.
+    
+    JSON and MessagePack decode to the same objects. An Arrow IPC stream
+    decodes to ColumnRecords, one record per table row, or to the only
+    record when ``single`` is set.
+    """
+    media_type = normalize_media_type(request.headers.get('content-type', JSON_MEDIA_TYPE))
+    body = await request.body()
+    
+    if media_type == MSGPACK_MEDIA_TYPE:
+        msgpack = import_wire_format(media_type, 415)
+        try:
+            return msgpack.unpackb(body, raw=False)
+        except Exception as e:
+            raise RequestValidationError([{'loc': ('body',), 'msg': f'Invalid MessagePack body: {e}', 'type': 'msgpack_invalid'}])
+    
+    if media_type == ARROW_MEDIA_TYPE:
+        pyarrow = import_wire_format(media_type, 415)
+        try:
+            table = pyarrow.ipc.open_stream(pyarrow.py_buffer(body)).read_all()
+        except Exception as e:
+            raise RequestValidationError([{'loc': ('body',), 'msg': f'Invalid Arrow IPC body: {e}', 'type': 'arrow_invalid'}])
+        records = ColumnRecords(arrow_table_to_columns(table), table.num_rows)
+        if not single:
+            return records
+        if len(records) != 1:
+            raise RequestValidationError([{'loc': ('body',), 'msg': f'Expected exactly one Arrow row, got {len(records)}', 'type': 'arrow_invalid'}])
+        return records[0]
+    
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise RequestValidationError([{'loc': ('body',), 'msg': 'Invalid JSON body', 'type': 'json_invalid'}])
+
+def prediction_rows(payload):
+    """Flatten a prediction or batch response into table rows for Arrow."""
+    if isinstance(payload, PredictionResponse):
+        items = [BatchPredictionItem(index=0, prediction=payload)]
+    else:
+        items = payload.results
+    rows = []
+    for item in items:
+        prediction = item.prediction.dict() if item.prediction is not None else {}
+        rows.append({
+            'index': item.index,
+            'crisis_probability': prediction.get('crisis_probability'),
+            'risk_level': prediction.get('risk_level'),
+            'confidence': prediction.get('confidence'),
+            'top_risk_factors': prediction.get('top_risk_factors'),
+            'recommendations': prediction.get('recommendations'),
+            'model_version': prediction.get('model_version'),
+            'prediction_timestamp': prediction.get('prediction_timestamp'),
+            'error': item.error
+        })
+    return rows
+
+def render_response(payload, runtime=None, media_type=JSON_MEDIA_TYPE):
+    """Serialize a response model, recording the serialization stage.
+    
+    JSON is the default; MessagePack carries the same document, and Arrow
+    IPC carries one row per prediction. Returning a ready Response also
+    spares FastAPI from validating and serializing the response model a
+    second time.
+    """
+    started = time.perf_counter()
+    if media_type == MSGPACK_MEDIA_TYPE:
+        content = import_wire_format(media_type, 406).packb(payload.dict(), use_bin_type=True)
+    elif media_type == ARROW_MEDIA_TYPE:
+        pyarrow = import_wire_format(media_type, 406)
+        table = pyarrow.Table.from_pylist(prediction_rows(payload))
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        content = sink.getvalue().to_pybytes()
+    else:
+        content = payload.json()
+    response = Response(content=content, media_type=media_type)
+    if runtime is not None:
+        response.headers['X-Model'] = runtime.model_key
+    record_stage('serialization', started)
+    return response
+
+def validation_error_details(error):
+    """Return the details of a ValidationError in a form that serializes to JSON."""
+    if PYDANTIC_V2:
+        # pydantic 2 puts the raised exception objects in 'ctx'; leave them out
+        return error.errors(include_context=False)
+    return error.errors()
+
+def parse_patient_data(body):
+    """Validate a decoded request body as PatientData, recording the validation stage.
+    
+    Errors are raised as RequestValidationError so clients get the same 422
+    response FastAPI produces for body validation.
+    """
+    started = time.perf_counter()
+    try:
+        patient_data = PatientData.parse_obj(body)
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**detail, 'loc': ('body',) + tuple(detail.get('loc', ()))}
+            for detail in validation_error_details(e)
+        ])
+    record_stage('validation', started)
+    return patient_data
+
+# OpenAPI descriptions of request bodies for endpoints that decode them themselves
+PATIENT_DATA_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            JSON_MEDIA_TYPE: {"schema": PatientData.schema()},
+            MSGPACK_MEDIA_TYPE: {"schema": PatientData.schema()}
+        }
+    }
+}
+PATIENT_BATCH_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            JSON_MEDIA_TYPE: {"schema": {"type": "array", "items": {"type": "object"}}},
+            MSGPACK_MEDIA_TYPE: {"schema": {"type": "array", "items": {"type": "object"}}},
+            ARROW_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}
+        }
+    }
+}
+
+async def warm_up_model(runtime, count):
+    """Run predictions through the full serving path to warm caches and lazy code paths.
+    
+    Warm-up predictions are not counted in the prediction or validation
+    row metrics; their stage timings are recorded like any other.
+    """
+    for _ in range(count):
+        results = await score_records(runtime, [SMOKE_TEST_PATIENT], count_rows=False)
+        if results[0].prediction is None:
+            raise ValueError(f"Warm-up prediction failed: {results[0].error}")
+        results[0].json()
+
+def announce_ready(model_key):
+    """Tell a supervising process that the server is ready for traffic.
+    
+    A uvicorn worker started by __main__ leaves this to its parent and only
+    records its readiness in WORKER_READY_DIR. Any other process, including
+    the workers of "uvicorn --workers N" or "--reload", announces itself.
+    """
+    global ready_file_written
+    if WORKER_READY_DIR and multiprocessing.parent_process() is not None:
+        path = os.path.join(WORKER_READY_DIR, f"{os.getpid()}.ready")
+        with open(f"{path}.tmp", 'w') as f:
+            f.write(model_key)
+        os.replace(f"{path}.tmp", path)
+        return
+    
+    if READY_LINE_ENABLED:
+        print(f"{READY_LINE_PREFIX} host={SERVER_HOST} port={SERVER_PORT} model={model_key}", flush=True)
+    if READY_FILE:
+        temp_path = f"{READY_FILE}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'host': SERVER_HOST, 'port': SERVER_PORT, 'pid': os.getpid(), 'model': model_key}, f)
+        os.replace(temp_path, READY_FILE)
+        ready_file_written = True
+
+def remove_ready_file():
+    """Remove READY_FILE if this process wrote it."""
+    if ready_file_written and os.path.exists(READY_FILE):
+        os.remove(READY_FILE)
+
+def announce_failed(error):
+    """Tell a supervising process that the default model could not be loaded."""
+    if READY_LINE_ENABLED:
+        print(f"{FAILED_LINE_PREFIX} error={error}", flush=True)
+
+def mark_ready(model_key, warmup_predictions=0):
+    """Record that the default model can take traffic, announcing it once."""
+    if readiness['status'] == 'ready':
+        return
+    readiness.update(
+        status='ready', error=None, ready_at=datetime.now().isoformat(), warmup_predictions=warmup_predictions
+    )
+    announce_ready(model_key)
+
+def note_model_loaded(runtime):
+    """Make the server ready when the default model was loaded outside the startup task."""
+    if runtime.model_key == canonical_model_key():
+        mark_ready(runtime.model_key)
+
+async def load_model_in_background():
+    """Load and warm up the default model after the server has started listening.
+    
+    A failed load is retried with a growing delay until it succeeds or the
+    default model was loaded some other way; the first failure is announced.
+    """
+    key = canonical_model_key()
+    loop = asyncio.get_running_loop()
+    delay = MODEL_LOAD_RETRY_DELAY
+    while readiness['status'] != 'ready':
+        try:
+            runtime = await loop.run_in_executor(None, model_registry.load, key)
+            await warm_up_model(runtime, WARMUP_PREDICTIONS)
+        except FileNotFoundError:
+            error = "Model file not found. Please train the model first."
+        except Exception as e:
+            error = f"Error loading model: {str(e)}"
+        else:
+            logger.info(f"Model {key} ready after {WARMUP_PREDICTIONS} warm-up predictions")
+            mark_ready(key, WARMUP_PREDICTIONS)
+            return
+        
+        if readiness['status'] == 'ready':
+            return
+        first_failure = readiness['status'] != 'failed'
+        readiness.update(status='failed', error=error)
+        logger.error(f"{error} Retrying in {delay:g}s")
+        if first_failure:
+            announce_failed(error)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, MODEL_LOAD_RETRY_MAX_DELAY)
+
 @app.on_event("startup")
 async def startup_event():
-    """Load model on startup."""
-    success = load_model()
-    if not success:
-        logger.error("Failed to load model on startup")
+    """Start the scoring pool and load the model in the background.
+    
+    Loading does not block startup, so the server binds and answers /health
+    immediately; /ready reports when the model can take traffic.
+    """
+    global model_watch_task, model_startup_task
+    scoring_pool.start()
+    model_startup_task = asyncio.create_task(load_model_in_background())
+    
+    if MODEL_WATCH_INTERVAL > 0:
+        model_watch_task = asyncio.create_task(watch_model_file())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks."""
+    for task in (model_watch_task, model_startup_task):
+        if task is not None:
+            task.cancel()
+    scoring_pool.shutdown()
+    remove_ready_file()
 
 @app.get("/")
 async def root():
@@ -273,139 +2152,546 @@ async def root():
         "message": "AetherFlow Sickle Cell Crisis Prediction API",
         "version": "1.0.0",
         "status": "active",
-        "model_loaded": model_package is not None
+        "model_loaded": model_registry.contains(canonical_model_key())
     }
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Liveness check: the process is up and answering. See /ready for the model."""
     return {
         "status": "healthy",
-        "model_loaded": model_package is not None,
+        "ready": readiness['status'] == 'ready',
+        "model_loaded": model_registry.contains(canonical_model_key()),
         "timestamp": datetime.now().isoformat()
     }
 
-@app.post("/predict", response_model=PredictionResponse)
-async def predict_crisis(patient_data: PatientData):
-    """Predict sickle cell crisis probability for a patient."""
-    
-    if model_package is None:
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """Readiness check: 200 once the default model is loaded and warmed up, 503 before."""
+    if readiness['status'] != 'ready':
+        response.status_code = 503
+    return {
+        "status": readiness['status'],
+        "model": canonical_model_key(),
+        "error": readiness['error'],
+        "ready_at": readiness['ready_at'],
+        "warmup_predictions": readiness['warmup_predictions'],
+        "timestamp": datetime.now().isoformat()
+    }
+
+async def resolve_model_runtime(
+    response: Response,
+    model: Optional[str] = Query(None, description="Model to use, as name or name@version"),
+    x_model: Optional[str] = Header(None, description="Model to use when no query parameter is given")
+):
+    """Pick the model for a request from the query string, header or default."""
+    try:
+        runtime = await get_model_runtime(model or x_model)
+    except UnknownModelError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Model artifact not found for '{model or x_model or DEFAULT_MODEL}'")
+    except Exception as e:
+        logger.error(f"Error loading model: {str(e)}")
         raise HTTPException(status_code=500, detail="Model not loaded")
     
+    response.headers['X-Model'] = runtime.model_key
+    return runtime
+
+@app.post("/predict", response_model=PredictionResponse, openapi_extra=PATIENT_DATA_BODY)
+async def predict_crisis(
+    request: Request,
+    explain: bool = Query(True, description="Include top risk factors; false skips the explanation stage"),
+    runtime: ModelRuntime = Depends(resolve_model_runtime)
+):
+    """Predict sickle cell crisis probability for a patient.
+    
+    Accepts and returns JSON by default, or MessagePack / Arrow IPC per the
+    Content-Type and Accept headers.
+    """
+    
+    media_type = negotiate_media_type(request)
+    body = await read_request_body(request, single=True)
+    patient_data = parse_patient_data(body)
+    
+    cache_key = None
+    if prediction_cache.enabled:
+        cache_key = prediction_cache.make_key(runtime, patient_data)
+        cached = prediction_cache.get(cache_key)
+        if cached is not None:
+            PREDICTIONS_TOTAL.inc(cached.risk_level)
+            update = {'prediction_timestamp': datetime.now().isoformat()}
+            if not explain:
+                update['top_risk_factors'] = []
+            return render_response(cached.copy(update=update), runtime, media_type)
+    
     try:
-        # Convert patient data to DataFrame
-        patient_dict = patient_data.dict()
-        
-        # Map field names to match training data
-        field_mapping = {
-            'pain_level': 'PainLevel',
-            'hbf_percent': 'HbF_percent',
-            'wbc_count': 'WBC_Count',
-            'ldh': 'LDH',
-            'crp': 'CRP',
-            'fatigue': 'Fatigue',
-            'fever': 'Fever',
-            'joint_pain': 'JointPain',
-            'dactylitis': 'Dactylitis',
-            'shortness_of_breath': 'Shortness_of_Breath',
-            'prior_crises': 'PriorCrises',
-            'history_of_acs': 'History_of_ACS',
-            'coexisting_asthma': 'Coexisting_Asthma',
-            'hydroxyurea': 'Hydroxyurea',
-            'pain_med': 'PainMed',
-            'medication_adherence': 'MedicationAdherence',
-            'hydration_level': 'HydrationLevel',
-            'sleep_quality': 'Sleep_Quality',
-            'reported_stress_level': 'Reported_Stress_Level',
-            'temperature': 'Temperature',
-            'humidity': 'Humidity',
-            'age': 'Age',
-            'sex': 'Sex',
-            'genotype': 'Genotype'
-        }
+        feature_row, probability = await score_patient(runtime, patient_data)
         
-        # Apply field mapping
-        mapped_data = {}
-        for api_field, model_field in field_mapping.items():
-            if api_field in patient_dict:
-                mapped_data[model_field] = patient_dict[api_field]
-        
-        patient_df = pd.DataFrame([mapped_data])
-        
-        # Create advanced features
-        patient_df = create_advanced_features(patient_df)
-        
-        # Apply label encoding for categorical variables
-        for col in ['Sex', 'Genotype', 'HydrationLevel']:
-            if col in patient_df.columns and col in model_package['label_encoders']:
-                patient_df[col] = model_package['label_encoders'][col].transform(patient_df[col].astype(str))
-        
-        # Ensure all features are present
-        for feature in model_package['feature_names']:
-            if feature not in patient_df.columns:
-                patient_df[feature] = 0
-        
-        # Select and order features
-        X = patient_df[model_package['feature_names']]
-        
-        # Preprocess and select features
-        X_processed = model_package['preprocessor'].transform(X)
-        X_selected = model_package['feature_selector'].transform(X_processed)
-        
-        # Make prediction
-        probability = model_package['model'].predict_proba(X_selected)[:, 1][0]
-        
-        # Get feature importance for interpretation
-        selected_features = model_package['feature_selector'].get_support()
-        selected_feature_names = [model_package['feature_names'][i] for i in range(len(selected_features)) if selected_features[i]]
-        
-        importance = np.abs(model_package['model'].coef_[0])
-        importance_df = pd.DataFrame({
-            'feature': selected_feature_names,
-            'importance': importance
-        }).sort_values('importance', ascending=False)
-        
-        # Generate response
-        risk_level = get_risk_level(probability)
-        confidence = get_confidence_level(probability)
-        top_risk_factors = get_top_risk_factors(patient_df, importance_df.head(10))
-        recommendations = get_recommendations(probability, patient_data)
-        
-        response = PredictionResponse(
-            crisis_probability=float(probability),
-            risk_level=risk_level,
-            confidence=confidence,
-            top_risk_factors=top_risk_factors,
-            recommendations=recommendations,
-            model_version=model_package['model_info'].get('best_model', 'Unknown'),
-            prediction_timestamp=datetime.now().isoformat()
-        )
+        top_risk_factors = get_top_risk_factors(runtime, feature_row) if explain else []
+        response = build_prediction_response(runtime, probability, patient_data, top_risk_factors)
+        rendered = render_response(response, runtime, media_type)
+        # Only complete responses are cached; explain=false can be served from them
+        if cache_key is not None and explain:
+            prediction_cache.put(cache_key, response, len(rendered.body))
+        PREDICTIONS_TOTAL.inc(response.risk_level)
         
-        logger.info(f"Prediction made: {probability:.4f} risk level: {risk_level}")
-        return response
+        logger.info(f"Prediction made: {probability:.4f} risk level: {response.risk_level}")
+        return rendered
         
+    except ScoringQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Prediction error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
-@app.get("/model-info")
-async def get_model_info():
-    """Get information about the loaded model."""
-    if model_package is None:
-        raise HTTPException(status_code=500, detail="Model not loaded")
+async def score_records(runtime, records, offset=0, explain=True, count_rows=True):
+    """Validate and score raw patient records, one BatchPredictionItem per record.
+    
+    Records are validated column-wise (see validate_records), so a bad row
+    is reported in its result slot instead of failing the rest. A record
+    that is an Exception (e.g. an unparseable line) is reported as that
+    error. Result indexes start at ``offset``. Top risk factors are computed
+    for the whole batch at once, or skipped when ``explain`` is false.
+    Predictions are not counted here; the endpoints count what they return.
+    """
+    results: List[Optional[BatchPredictionItem]] = [None] * len(records)
+    
+    valid_patients, valid_indices, errors = validate_records(records, count_rows)
+    for index, error in enumerate(errors):
+        if error is not None:
+            results[index] = BatchPredictionItem(index=offset + index, error=error)
+    
+    if len(valid_patients):
+        # Rows with categories the encoders never saw cannot be scored
+        label_errors = find_unseen_labels(runtime, valid_patients)
+        scorable = [i for i, error in enumerate(label_errors) if error is None]
+        for i, error in enumerate(label_errors):
+            if error is not None:
+                results[valid_indices[i]] = BatchPredictionItem(index=offset + valid_indices[i], error=error)
+        
+        if scorable:
+            scored_patients = valid_patients.take(scorable)
+            X, probabilities = await scoring_pool.run(runtime, scored_patients)
+            top_risk_factors = explain_predictions(runtime, X) if explain else [[] for _ in scorable]
+            
+            for row, i in enumerate(scorable):
+                index = valid_indices[i]
+                results[index] = BatchPredictionItem(
+                    index=offset + index,
+                    prediction=build_prediction_response(
+                        runtime, probabilities[row], scored_patients.row(row), top_risk_factors[row]
+                    )
+                )
+    
+    return results
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse, openapi_extra=PATIENT_BATCH_BODY)
+async def predict_crisis_batch(
+    request: Request,
+    explain: bool = Query(True, description="Include top risk factors; false skips the explanation stage"),
+    runtime: ModelRuntime = Depends(resolve_model_runtime)
+):
+    """Predict crisis probability for many patients in one vectorized pass.
+    
+    Each record is validated on its own, so a bad row is reported in its
+    result slot instead of rejecting the whole batch. The body is a JSON or
+    MessagePack array of records, or an Arrow IPC stream with one row per
+    record; the response format follows the Accept header.
+    """
+    
+    media_type = negotiate_media_type(request)
+    records = await read_request_body(request)
+    if not isinstance(records, (list, ColumnRecords)):
+        raise RequestValidationError([{'loc': ('body',), 'msg': 'Input should be a valid list', 'type': 'list_type'}])
+    
+    if len(records) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(records)} records (maximum {MAX_BATCH_SIZE})"
+        )
+    
+    try:
+        results = await score_records(runtime, records, explain=explain)
+    except ScoringQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error(f"Batch prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+    
+    count_predictions(results)
+    succeeded = sum(1 for item in results if item.prediction is not None)
+    logger.info(f"Batch prediction made: {succeeded}/{len(records)} records scored")
+    
+    return render_response(BatchPredictionResponse(
+        results=results,
+        total=len(records),
+        succeeded=succeeded,
+        failed=len(records) - succeeded
+    ), runtime, media_type)
+
+class UploadStreamingResponse(StreamingResponse):
+    """StreamingResponse that may keep reading the request body while it sends.
+    
+    Before ASGI 2.4, Starlette watches receive() for a disconnect while
+    streaming, which would swallow the upload chunks the body generator
+    is still consuming. Disconnects surface as send errors instead.
+    """
     
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+def inflate_upload_chunk(decompressor, chunk):
+    """Yield the inflated data of one gzip chunk in pieces of bounded size.
+    
+    Output is capped per step, so a small, highly compressed chunk never
+    expands into one huge buffer.
+    """
+    data = decompressor.decompress(chunk, STREAM_INFLATE_BYTES)
+    while True:
+        if data:
+            yield data
+        if not decompressor.unconsumed_tail:
+            return
+        data = decompressor.decompress(decompressor.unconsumed_tail, STREAM_INFLATE_BYTES)
+
+async def iter_upload_lines(request):
+    """Yield decoded text lines of the request body as it arrives.
+    
+    Gzip (Content-Encoding: gzip, or the gzip magic bytes) is inflated
+    incrementally, so only the current chunk and a partial line are held.
+    A line longer than STREAM_MAX_LINE_BYTES is dropped as it arrives and
+    yielded as a ValueError in its place.
+    """
+    decompressor = None
+    gzip_declared = 'gzip' in request.headers.get('content-encoding', '').lower()
+    first_chunk = True
+    # Pieces of the current partial line, kept apart to avoid quadratic copying
+    pending = []
+    pending_size = 0
+    too_long = False
+    too_long_error = f"Line longer than {STREAM_MAX_LINE_BYTES} bytes"
+    
+    def split_lines(data):
+        nonlocal pending, pending_size, too_long
+        start = 0
+        while True:
+            end = data.find(b'\n', start)
+            if end < 0:
+                break
+            if too_long or pending_size + end - start > STREAM_MAX_LINE_BYTES:
+                yield ValueError(too_long_error)
+            else:
+                pending.append(data[start:end])
+                yield b''.join(pending).decode('utf-8').rstrip('\r')
+            pending, pending_size, too_long = [], 0, False
+            start = end + 1
+        if too_long or start == len(data):
+            return
+        pending_size += len(data) - start
+        if pending_size > STREAM_MAX_LINE_BYTES:
+            pending, pending_size, too_long = [], 0, True
+        else:
+            pending.append(data[start:])
+    
+    async for chunk in request.stream():
+        if not chunk:
+            continue
+        if first_chunk:
+            first_chunk = False
+            if gzip_declared or chunk[:2] == b'\x1f\x8b':
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        pieces = inflate_upload_chunk(decompressor, chunk) if decompressor is not None else [chunk]
+        for data in pieces:
+            for line in split_lines(data):
+                yield line
+    
+    if decompressor is not None:
+        for line in split_lines(decompressor.flush()):
+            yield line
+    if too_long:
+        yield ValueError(too_long_error)
+    elif pending:
+        yield b''.join(pending).decode('utf-8').rstrip('\r')
+
+# Accepts both API field names and training column names as CSV headers
+CSV_HEADER_ALIASES = {model_field: api_field for api_field, model_field in FIELD_MAPPING.items()}
+
+async def iter_csv_rows(lines):
+    """Yield parsed CSV rows from a stream of text lines.
+    
+    A quoted field may span lines: lines are gathered until every quote is
+    closed (quotes, doubled ones included, then come in pairs) and the
+    record is parsed as a whole. Errors in the line stream, and records
+    that grow past STREAM_MAX_LINE_BYTES or end inside a quote, are
+    yielded as ValueError.
+    """
+    record = []
+    record_size = 0
+    quotes = 0
+    async for line in lines:
+        if isinstance(line, ValueError):
+            record, record_size, quotes = [], 0, 0
+            yield line
+            continue
+        if not record and not line.strip():
+            continue
+        record.append(line)
+        record_size += len(line) + 1
+        quotes += line.count('"')
+        if record_size > STREAM_MAX_LINE_BYTES:
+            record, record_size, quotes = [], 0, 0
+            yield ValueError(f"CSV record longer than {STREAM_MAX_LINE_BYTES} bytes")
+            continue
+        if quotes % 2:
+            continue
+        yield next(csv.reader(['\n'.join(record)]))
+        record, record_size, quotes = [], 0, 0
+    if record:
+        yield ValueError("CSV record ends inside a quoted field")
+
+async def iter_upload_records(request, upload_format):
+    """Yield one raw patient record per NDJSON line or CSV row of the upload.
+    
+    Lines that cannot be parsed are yielded as ValueError so they take up
+    a result slot with an error message.
+    """
+    lines = iter_upload_lines(request)
+    if upload_format == 'ndjson':
+        async for line in lines:
+            if isinstance(line, ValueError):
+                yield line
+                continue
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                yield record if isinstance(record, dict) else ValueError("Record is not a JSON object")
+            except ValueError as e:
+                yield ValueError(f"Invalid JSON: {e}")
+        return
+    
+    header = None
+    async for values in iter_csv_rows(lines):
+        if isinstance(values, ValueError):
+            yield values
+            continue
+        if header is None:
+            header = [CSV_HEADER_ALIASES.get(name.strip(), name.strip()) for name in values]
+            continue
+        if len(values) != len(header):
+            yield ValueError(f"Expected {len(header)} CSV columns, got {len(values)}")
+            continue
+        # Empty cells are treated as missing, like NaN in the training data
+        yield {name: value for name, value in zip(header, values) if value != ''}
+
+async def stream_scored_records(runtime, records, explain=True):
+    """Score an async record stream in fixed-size chunks, yielding NDJSON lines."""
+    chunk = []
+    offset = 0
+    
+    async def flush(chunk, offset):
+        while True:
+            try:
+                results = await score_records(runtime, chunk, offset, explain)
+                count_predictions(results)
+                return results
+            except ScoringQueueFull:
+                # The response has started, so wait for capacity instead of failing
+                await asyncio.sleep(0.05)
+    
+    try:
+        async for record in records:
+            chunk.append(record)
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                for item in await flush(chunk, offset):
+                    yield item.json() + '\n'
+                offset += len(chunk)
+                chunk = []
+        if chunk:
+            for item in await flush(chunk, offset):
+                yield item.json() + '\n'
+            offset += len(chunk)
+        logger.info(f"Streamed predictions for {offset} records")
+    except Exception as e:
+        # Headers are already sent; report the failure as a final line
+        logger.error(f"Streaming prediction error: {str(e)}")
+        yield json.dumps({"error": f"Streaming prediction failed: {str(e)}", "index": offset}) + '\n'
+
+@app.post("/predict/stream")
+async def predict_crisis_stream(
+    request: Request,
+    format: Optional[str] = Query(None, description="Upload format, 'ndjson' or 'csv' (default: from Content-Type)"),
+    explain: bool = Query(True, description="Include top risk factors; false skips the explanation stage"),
+    runtime: ModelRuntime = Depends(resolve_model_runtime)
+):
+    """Score an NDJSON or CSV upload of any size, streaming NDJSON results back.
+    
+    The upload may be gzip-compressed. Records are parsed and scored in
+    chunks of STREAM_CHUNK_SIZE while the body is still arriving, using
+    the same validation and scoring as /predict/batch; each output line
+    is one BatchPredictionItem.
+    """
+    upload_format = format
+    if upload_format is None:
+        content_type = request.headers.get('content-type', '')
+        upload_format = 'csv' if 'csv' in content_type else 'ndjson'
+    if upload_format not in ('ndjson', 'csv'):
+        raise HTTPException(status_code=415, detail=f"Unsupported upload format '{upload_format}'")
+    
+    return UploadStreamingResponse(
+        stream_scored_records(runtime, iter_upload_records(request, upload_format), explain),
+        media_type='application/x-ndjson',
+        headers={'X-Model': runtime.model_key}
+    )
+
+@app.post("/admin/reload")
+async def admin_reload_model(
+    model: Optional[str] = Query(None, description="Model to reload, as name or name@version"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Reload a model artifact from disk without dropping requests."""
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    
+    try:
+        runtime = await reload_model(model)
+    except UnknownModelError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Model reload failed, keeping current model: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {str(e)}")
+    
+    return {
+        "status": "reloaded",
+        "model": runtime.model_key,
+        "model_version": runtime.model_version,
+        "model_path": runtime.source_path,
+        "loaded_at": runtime.loaded_at
+    }
+
+@app.get("/stats")
+async def get_stats():
+    """Runtime statistics for sizing caches and queues."""
+    return {
+        "prediction_cache": prediction_cache.stats(),
+        "micro_batcher": micro_batcher.stats(),
+        "scoring_pool": scoring_pool.stats()
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics in the text exposition format.
+    
+    With the process scoring pool, stages that run inside scoring processes
+    are recorded there and do not appear here.
+    """
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    
+    # Component counters are kept by their owners and rendered on demand
+    for prefix, stats in (
+        ('aetherflow_prediction_cache', prediction_cache.stats()),
+        ('aetherflow_micro_batcher', micro_batcher.stats()),
+        ('aetherflow_scoring_pool', scoring_pool.stats())
+    ):
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            lines.append(f"# TYPE {prefix}_{key} gauge")
+            lines.append(f"{prefix}_{key} {value}")
+    
+    return Response(content='\n'.join(lines) + '\n', media_type='text/plain; version=0.0.4')
+
+@app.get("/model-info")
+async def get_model_info(runtime: ModelRuntime = Depends(resolve_model_runtime)):
+    """Get information about the selected model and what is resident."""
     return {
-        "model_info": model_package.get('model_info', {}),
-        "feature_count": len(model_package.get('feature_names', [])),
-        "model_type": type(model_package['model']).__name__
+        "model": runtime.model_key,
+        "model_info": runtime.model_info,
+        "feature_count": len(runtime.feature_names),
+        "model_type": runtime.model_type,
+        "model_path": runtime.source_path,
+        "loaded_at": runtime.loaded_at,
+        "default_model": canonical_model_key(),
+        "resident_models": [
+            {
+                "model": resident.model_key,
+                "model_version": resident.model_version,
+                "loaded_at": resident.loaded_at
+            }
+            for resident in model_registry.resident()
+        ],
+        "available_models": list_available_models(),
+        "model_cache_size": model_registry.capacity
     }
 
+def prepare_shared_model_state():
+    """Export the default model's state for uvicorn workers to memory-map."""
+    global SHARED_MODEL_DIR
+    if not SHARED_MODEL_DIR:
+        SHARED_MODEL_DIR = tempfile.mkdtemp(prefix='aetherflow-model-')
+        atexit.register(shutil.rmtree, SHARED_MODEL_DIR, True)
+    # Workers inherit the environment and read the directory on import
+    os.environ['AETHERFLOW_SHARED_MODEL_DIR'] = SHARED_MODEL_DIR
+    
+    key = canonical_model_key()
+    model_path = get_model_path(key)
+    model_mtime = os.path.getmtime(get_model_source_path(model_path))
+    state, _ = load_model_state(model_path)
+    if 'coef' not in state:
+        logger.warning(f"Model {key} cannot be shared; each worker will load it")
+        return
+    export_model_state(state, get_shared_state_path(key), model_path, model_mtime)
+    logger.info(f"Exported shared model state for {key} to {get_shared_state_path(key)}")
+
+def watch_worker_readiness(workers):
+    """Announce readiness from this process once all uvicorn workers are ready.
+    
+    Workers inherit AETHERFLOW_WORKER_READY_DIR and record their readiness
+    there, so the ready line is printed once and only this process writes
+    and removes READY_FILE.
+    """
+    ready_dir = tempfile.mkdtemp(prefix='aetherflow-ready-')
+    atexit.register(shutil.rmtree, ready_dir, True)
+    atexit.register(remove_ready_file)
+    os.environ['AETHERFLOW_WORKER_READY_DIR'] = ready_dir
+    
+    def wait_for_workers():
+        while True:
+            names = [name for name in os.listdir(ready_dir) if name.endswith('.ready')]
+            if len(names) >= workers:
+                break
+            time.sleep(0.1)
+        with open(os.path.join(ready_dir, names[0])) as f:
+            announce_ready(f.read())
+    
+    threading.Thread(target=wait_for_workers, name='worker-readiness', daemon=True).start()
+
 if __name__ == "__main__":
+    import uvicorn
+    
+    if SERVER_PORT == 0:
+        # Pick the port up front, so the ready line reports the one uvicorn binds
+        with socket.socket() as sock:
+            sock.bind((SERVER_HOST, 0))
+            SERVER_PORT = sock.getsockname()[1]
+    # uvicorn imports the app as a fresh module, in this process or in workers
+    os.environ['AETHERFLOW_PORT'] = str(SERVER_PORT)
+    
+    if SERVER_WORKERS > 1:
+        prepare_shared_model_state()
+        watch_worker_readiness(SERVER_WORKERS)
+    
     # Run the API server
     uvicorn.run(
         "inference_api:app",
-        host="127.0.0.1",
-        port=8000,
+        host=SERVER_HOST,
+        port=SERVER_PORT,
         reload=False,
-        log_level="info"
+        log_level="info",
+        workers=SERVER_WORKERS
     )
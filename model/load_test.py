@@ -0,0 +1,294 @@
+"""
+HTTP load test for the inference server.
+
+Drives /predict (or /predict/batch) with a mix of the test_api.py fixtures
+and patients sampled from the simulated dataset, at a fixed concurrency and
+optionally a fixed request rate, then reports throughput, latency
+percentiles and the error rate:
+
+    python load_test.py --start-server                   # launch a local server and test it
+    python load_test.py --url http://localhost:8000 --concurrency 16 --rate 200
+    python load_test.py --mix high=1,low=1,simulated=8 --batch-size 50
+    python load_test.py --start-server --update          # record a new baseline
+
+With --rate, requests are scheduled at fixed intervals and latency is
+measured from the scheduled time, so a server that falls behind shows it
+in the percentiles. Without it every worker sends as fast as it can.
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from benchmark_utils import check_above, check_baseline, check_below, free_port, load_baseline, write_baseline
+from test_api import HIGH_RISK_PATIENT, LOW_RISK_PATIENT
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(MODEL_DIR, 'load_test_baseline.json')
+SIMULATED_DATA_PATH = os.path.join(MODEL_DIR, 'sickle_cell_crisis_simulated.csv')
+
+# Payload kinds and their default weights
+DEFAULT_MIX = 'high=1,low=1,simulated=8'
+
+# Allowed change against the baseline before the check fails
+DEFAULT_TOLERANCE = 0.25
+
+# Error rate allowed on top of the baseline's
+ERROR_RATE_TOLERANCE = 0.01
+
+# Simulated patients kept in memory to sample payloads from
+SIMULATED_POOL_SIZE = 2000
+
+def parse_mix(text):
+    """Parse 'kind=weight,...' into a {kind: weight} dict."""
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in ('high', 'low', 'simulated'):
+            raise ValueError(f"Unknown payload kind '{kind}' (use high, low or simulated)")
+        mix[kind] = float(weight or 1)
+    if sum(mix.values()) <= 0:
+        raise ValueError("Payload mix weights must add up to more than zero")
+    return mix
+
+def load_simulated_patients(path=SIMULATED_DATA_PATH, limit=SIMULATED_POOL_SIZE, seed=0):
+    """Sample simulated rows the API accepts and the model can encode, as API records.
+
+    Rows are validated with the server's own validator; rows it rejects
+    (e.g. hydration 'Normal') or whose categories the model never saw are
+    skipped, so every simulated payload is expected to succeed.
+    """
+    import inference_api as api
+    from model_artifact import get_artifact_path, load_model_artifact
+
+    with open(path, newline='') as f:
+        records = [
+            {api.CSV_HEADER_ALIASES.get(name, name): value for name, value in row.items() if value != ''}
+            for row in csv.DictReader(f)
+        ]
+    batch, _, _ = api.validate_records(records)
+
+    state, _ = load_model_artifact(get_artifact_path(api.get_model_path(api.DEFAULT_MODEL)))
+    known = np.ones(len(batch), dtype=bool)
+    for col, values in batch.training_columns().items():
+        if col in state['label_classes']:
+            known &= np.isin(values, state['label_classes'][col])
+
+    positions = np.flatnonzero(known)
+    rng = random.Random(seed)
+    positions = rng.sample(list(positions), min(limit, len(positions)))
+    int_fields = {name for name, annotation, _ in api.get_field_constraints(api.PatientData) if annotation is int}
+    patients = []
+    for position in positions:
+        row = batch.row(position)
+        patients.append({
+            name: int(getattr(row, name)) if name in int_fields else getattr(row, name).item()
+            for name in batch.columns
+        })
+    return patients
+
+class PayloadSource:
+    """Picks the next payload kind by weight and builds its request body."""
+
+    def __init__(self, mix, simulated, batch_size, seed=0):
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.simulated = simulated
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def patient(self, kind):
+        if kind == 'high':
+            return HIGH_RISK_PATIENT
+        if kind == 'low':
+            return LOW_RISK_PATIENT
+        return self.rng.choice(self.simulated)
+
+    def next(self):
+        """Return (kind, body) for one request."""
+        with self.lock:
+            kind = self.rng.choices(self.kinds, self.weights)[0]
+            if self.batch_size:
+                return kind, [self.patient(kind) for _ in range(self.batch_size)]
+            return kind, self.patient(kind)
+
+def run_load(url, source, concurrency, rate=None, requests_total=None, duration=None, timeout=30.0):
+    """Send requests from `concurrency` threads and return one sample per request.
+
+    Stops after ``requests_total`` requests or ``duration`` seconds, whichever
+    comes first. A sample is (kind, latency seconds, status code or None).
+    """
+    endpoint = f"{url}/predict/batch" if source.batch_size else f"{url}/predict"
+    samples = []
+    counter = iter(range(requests_total if requests_total else sys.maxsize))
+    counter_lock = threading.Lock()
+    started = time.perf_counter()
+
+    def worker():
+        session = requests.Session()
+        while True:
+            with counter_lock:
+                sequence = next(counter, None)
+            if sequence is None:
+                return
+            scheduled = started + sequence / rate if rate else time.perf_counter()
+            if duration and scheduled - started >= duration:
+                return
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            kind, body = source.next()
+            try:
+                status = session.post(endpoint, json=body, timeout=timeout).status_code
+            except requests.exceptions.RequestException:
+                status = None
+            samples.append((kind, time.perf_counter() - scheduled, status))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return samples, time.perf_counter() - started
+
+def summarize(samples, elapsed):
+    """Return throughput, latency percentiles (ms) and error rate for a set of samples."""
+    latencies = np.array([latency for _, latency, _ in samples]) * 1000
+    errors = sum(1 for _, _, status in samples if status != 200)
+    return {
+        'requests': len(samples),
+        'throughput_rps': len(samples) / elapsed if elapsed > 0 else 0.0,
+        'p50_ms': float(np.percentile(latencies, 50)) if len(samples) else 0.0,
+        'p95_ms': float(np.percentile(latencies, 95)) if len(samples) else 0.0,
+        'p99_ms': float(np.percentile(latencies, 99)) if len(samples) else 0.0,
+        'error_rate': errors / len(samples) if samples else 0.0
+    }
+
+def compare(result, baseline, tolerance):
+    """Return a list of regressions of result against baseline."""
+    problems = [check_below('throughput', result['throughput_rps'], baseline['throughput_rps'], tolerance, ' req/s')]
+    for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+        problems.append(check_above(key, result[key], baseline[key], tolerance))
+    if result['error_rate'] > baseline['error_rate'] + ERROR_RATE_TOLERANCE:
+        problems.append(f"error rate {result['error_rate']:.2%} above baseline {baseline['error_rate']:.2%}")
+    return [problem for problem in problems if problem]
+
+def start_server(timeout=120.0):
+    """Launch a local server on a free port and wait until /ready answers."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'inference_api:app', '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning'],
+        cwd=MODEL_DIR, env=dict(os.environ, PYTHONWARNINGS='ignore'),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            if requests.get(f"{url}/ready", timeout=1).status_code == 200:
+                return server, url
+        except requests.exceptions.RequestException:
+            pass
+        if server.poll() is not None:
+            break
+        time.sleep(0.1)
+    server.terminate()
+    server.wait()
+    raise RuntimeError(f"Server did not become ready within {timeout:.0f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the inference server")
+    parser.add_argument('--url', default='http://localhost:8000', help="Server to test")
+    parser.add_argument('--start-server', action='store_true', help="Launch a local server on a free port instead")
+    parser.add_argument('--concurrency', type=int, default=8, help="Requests in flight at once")
+    parser.add_argument('--rate', type=float, default=None, help="Target requests per second (default: unthrottled)")
+    parser.add_argument('--requests', type=int, default=None, help="Requests to send (default: 2000 without --duration)")
+    parser.add_argument('--duration', type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="Payload kinds and weights, e.g. high=1,low=1,simulated=8")
+    parser.add_argument('--batch-size', type=int, default=0, help="Send batches of this many patients to /predict/batch")
+    parser.add_argument('--warmup', type=int, default=50, help="Untimed requests sent first")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="Write the results as JSON to this file")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="Allowed regression, e.g. 0.25")
+    parser.add_argument('--update', action='store_true', help="Write the results as the new baseline")
+    args = parser.parse_args()
+
+    if args.requests is None and args.duration is None:
+        args.requests = 2000
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    simulated = load_simulated_patients(seed=args.seed) if 'simulated' in mix else []
+    source = PayloadSource(mix, simulated, args.batch_size, seed=args.seed)
+
+    server = None
+    url = args.url.rstrip('/')
+    if args.start_server:
+        server, url = start_server()
+    try:
+        if args.warmup:
+            run_load(url, source, args.concurrency, requests_total=args.warmup)
+        samples, elapsed = run_load(
+            url, source, args.concurrency, rate=args.rate,
+            requests_total=args.requests, duration=args.duration
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if samples and all(status is None for _, _, status in samples):
+        print(f"❌ Could not connect to {url}")
+        print("Start the server with: python inference_api.py (or use --start-server)")
+        sys.exit(1)
+
+    result = summarize(samples, elapsed)
+    result['by_kind'] = {
+        kind: summarize([sample for sample in samples if sample[0] == kind], elapsed)
+        for kind in mix
+    }
+    result['config'] = {
+        'concurrency': args.concurrency, 'rate': args.rate, 'mix': args.mix,
+        'batch_size': args.batch_size, 'python': platform.python_version()
+    }
+
+    print(f"{result['requests']} requests in {elapsed:.2f}s at concurrency {args.concurrency}")
+    print(f"Throughput: {result['throughput_rps']:.1f} req/s")
+    print(f"Latency: p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms")
+    print(f"Error rate: {result['error_rate']:.2%}")
+    for kind, stats in result['by_kind'].items():
+        print(f"  {kind:<10} {stats['requests']:>6} requests, p95 {stats['p95_ms']:.1f} ms, errors {stats['error_rate']:.2%}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+            f.write('\n')
+        print(f"Results written to {args.output}")
+
+    if args.update:
+        write_baseline(BASELINE_PATH, result)
+        return
+
+    baseline = load_baseline(BASELINE_PATH)
+    if baseline is not None and baseline.get('config', {}) != result['config']:
+        print("Baseline was recorded with different settings; comparison may not be meaningful")
+    check_baseline(result, baseline, compare, args.tolerance, "Load test within baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Pickle-free model artifacts for Sickle Cell Crisis Prediction.
+
+A trained package (median imputer, standard scaler, optional SelectKBest,
+logistic regression and label encoders) is reduced to its numeric state and
+written as a .npz file next to the pickle. The artifact records the SHA-256
+of the pickle it was exported from, and loading it needs NumPy only, so the
+inference server can start without unpickling sklearn estimators.
+
+Export the artifacts of existing pickles with:
+
+    python model_artifact.py enhanced_sickle_cell_model.pkl sickle_cell_crisis_model.pkl
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+# Bumped whenever the layout of the artifact changes
+ARTIFACT_FORMAT_VERSION = 1
+
+# Arrays of a model state; everything else is JSON metadata
+MODEL_STATE_ARRAYS = ('support', 'importance', 'fill_values', 'mean', 'scale', 'coef')
+
+class ArtifactMismatchError(ValueError):
+    """Raised when an artifact was not exported from the pickle next to it."""
+
+def get_model_importance(model):
+    """Return a non-negative importance score per model input."""
+    if hasattr(model, 'coef_'):
+        return np.abs(model.coef_[0])
+    if hasattr(model, 'feature_importances_'):
+        return np.asarray(model.feature_importances_, dtype=float)
+    return np.zeros(getattr(model, 'n_features_in_', 0))
+
+def extract_model_state(package):
+    """Pull the numeric state of a model package out of its sklearn objects.
+
+    The state always carries the feature order, selection mask, importance
+    scores and encoder classes. The imputer medians, scaler means and
+    scales, coefficients and intercept are added when the package is an
+    imputer/scaler/(selector)/logistic regression stack.
+    """
+    model = package['model']
+    feature_names = list(package['feature_names'])
+    selector = package.get('feature_selector')
+    support = selector.get_support() if selector is not None else np.ones(len(feature_names), dtype=bool)
+
+    state = {
+        'feature_names': feature_names,
+        'support': np.asarray(support, dtype=bool),
+        'importance': get_model_importance(model),
+        'label_classes': {
+            col: [str(label) for label in le.classes_]
+            for col, le in package['label_encoders'].items()
+        },
+        'model_info': package.get('model_info', {}),
+        'model_type': type(model).__name__
+    }
+
+    try:
+        imputer = package['preprocessor'].named_steps['imputer']
+        scaler = package['preprocessor'].named_steps['scaler']
+        if type(model).__name__ == 'LogisticRegression' and model.coef_.shape[0] == 1:
+            fill_values = np.asarray(imputer.statistics_, dtype=float)
+            if len(fill_values) == len(feature_names) and np.all(np.isfinite(fill_values)):
+                state.update({
+                    'fill_values': fill_values,
+                    'mean': np.asarray(scaler.mean_, dtype=float),
+                    'scale': np.asarray(scaler.scale_, dtype=float),
+                    'coef': np.asarray(model.coef_[0], dtype=float),
+                    'intercept': float(model.intercept_[0])
+                })
+    except (AttributeError, KeyError):
+        pass
+
+    return state
+
+def json_default(value):
+    """Convert NumPy scalars and arrays for json.dump."""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+def file_sha256(path):
+    """Return the hex SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def get_artifact_path(pickle_path):
+    """Return where the pickle-free artifact of a model pickle lives."""
+    return os.path.splitext(pickle_path)[0] + '.npz'
+
+def export_model_artifact(package, artifact_path, pickle_path=None):
+    """Write the numeric state of a model package as a .npz artifact.
+
+    Only linear packages can be exported; anything else raises ValueError.
+    The file is written through a rename so readers never see half of it.
+    """
+    state = extract_model_state(package)
+    if 'coef' not in state:
+        raise ValueError(f"{state['model_type']} models cannot be exported without pickle")
+
+    metadata = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'feature_names': state['feature_names'],
+        'label_classes': state['label_classes'],
+        'model_info': state['model_info'],
+        'model_type': state['model_type'],
+        'pickle_sha256': file_sha256(pickle_path) if pickle_path else None
+    }
+    arrays = {name: np.asarray(state[name]) for name in MODEL_STATE_ARRAYS}
+
+    temp_path = f"{artifact_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        np.savez(
+            f,
+            intercept=np.float64(state['intercept']),
+            metadata=np.array(json.dumps(metadata, default=json_default)),
+            **arrays
+        )
+    os.replace(temp_path, artifact_path)
+    return state
+
+def load_model_artifact(artifact_path, pickle_path=None):
+    """Load a .npz artifact as a model state, without pickle or sklearn.
+
+    When ``pickle_path`` exists, its hash must match the one recorded at
+    export time, otherwise ArtifactMismatchError is raised. Returns
+    (state, metadata).
+    """
+    with np.load(artifact_path, allow_pickle=False) as data:
+        metadata = json.loads(str(data['metadata']))
+        if metadata.get('format_version') != ARTIFACT_FORMAT_VERSION:
+            raise ArtifactMismatchError(
+                f"{artifact_path} has format version {metadata.get('format_version')}, "
+                f"expected {ARTIFACT_FORMAT_VERSION}"
+            )
+        state = {name: data[name] for name in MODEL_STATE_ARRAYS}
+        state['intercept'] = float(data['intercept'])
+
+    if pickle_path and os.path.exists(pickle_path):
+        if file_sha256(pickle_path) != metadata.get('pickle_sha256'):
+            raise ArtifactMismatchError(f"{artifact_path} was not exported from {pickle_path}")
+
+    state.update({
+        'feature_names': metadata['feature_names'],
+        'label_classes': metadata['label_classes'],
+        'model_info': metadata['model_info'],
+        'model_type': metadata['model_type']
+    })
+    return state, metadata
+
+def main():
+    """Export the pickle-free artifact of each pickle given on the command line."""
+    import joblib
+
+    pickle_paths = sys.argv[1:]
+    if not pickle_paths:
+        print("Usage: python model_artifact.py MODEL.pkl [MODEL.pkl ...]")
+        sys.exit(1)
+
+    for pickle_path in pickle_paths:
+        artifact_path = get_artifact_path(pickle_path)
+        try:
+            export_model_artifact(joblib.load(pickle_path), artifact_path, pickle_path)
+            print(f"Exported {pickle_path} -> {artifact_path}")
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Skipping {pickle_path}: {e}")
+
+if __name__ == "__main__":
+    main()
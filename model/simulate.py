@@ -1,12 +1,21 @@
 import pandas as pd
 import numpy as np
+import argparse
+import glob
 import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 # --- Configuration Object for Easy Tuning ---
 CONFIG = {
     'simulation_params': {
         'num_patients': 200,
         'days_per_patient': 30, # Simulating a 1-month period
+        'seed': None, # Master seed; None draws fresh entropy (printed so a run can be repeated)
+        'shard_size': 10000, # Patients per independently seeded shard
+        'workers': 1, # Processes generating shards in parallel
+        'label_threshold': None, # Fixed P_Crisis threshold for labels; None uses the cohort median (in-memory runs only)
     },
     'patient_profile_params': {
         'age_range': (18, 55),
@@ -48,11 +57,22 @@ CONFIG = {
     }
 }
 
+# Genotype influences baseline lab values and pain
+GENOTYPE_BASELINES = {'HbSS': {'wbc': 12, 'ldh': 400, 'hbf': 5}, 'HbSC': {'wbc': 8, 'ldh': 250, 'hbf': 2}, 'HbS_beta_thal': {'wbc': 10, 'ldh': 300, 'hbf': 10}}
+GENOTYPE_PAIN_MOD = {'HbSS': 1.5, 'HbSC': 0.5, 'HbS_beta_thal': 1.0}
+
 def sigmoid(x):
     """Sigmoid function to map any value to a probability between 0 and 1."""
     if x < -500: return 0
     return 1 / (1 + math.exp(-x))
 
+def sigmoid_array(x):
+    """Vectorized sigmoid(): exp may overflow to inf (giving 0), and values below -500 map to 0."""
+    x = np.asarray(x, dtype=float)
+    with np.errstate(over='ignore'):
+        probabilities = 1 / (1 + np.exp(-x))
+    return np.where(x < -500, 0.0, probabilities)
+
 def generate_patient_profiles(config):
     """Generates a DataFrame of static patient profiles, including comorbidities and baseline labs."""
     num_patients = config['simulation_params']['num_patients']
@@ -68,7 +88,7 @@ def generate_patient_profiles(config):
     })
     
     # Genotype influences baseline lab values
-    genotype_mods = {'HbSS': {'wbc': 12, 'ldh': 400, 'hbf': 5}, 'HbSC': {'wbc': 8, 'ldh': 250, 'hbf': 2}, 'HbS_beta_thal': {'wbc': 10, 'ldh': 300, 'hbf': 10}}
+    genotype_mods = GENOTYPE_BASELINES
     profiles['Baseline_WBC'] = profiles['Genotype'].apply(lambda g: np.random.normal(genotype_mods[g]['wbc'], 2))
     profiles['Baseline_LDH'] = profiles['Genotype'].apply(lambda g: np.random.normal(genotype_mods[g]['ldh'], 50))
     profiles['HbF_percent'] = profiles['Genotype'].apply(lambda g: np.random.normal(genotype_mods[g]['hbf'], 2))
@@ -80,7 +100,7 @@ def generate_patient_trajectory(patient_profile, config):
     num_days = config['simulation_params']['days_per_patient']
     
     # Patient's baseline characteristics
-    genotype_pain_mod = {'HbSS': 1.5, 'HbSC': 0.5, 'HbS_beta_thal': 1.0}
+    genotype_pain_mod = GENOTYPE_PAIN_MOD
     base_pain = np.random.uniform(0, 3) + genotype_pain_mod.get(patient_profile['Genotype'], 1.0)
     adherence_prob = np.random.uniform(0.5, 0.95)
     pain_yesterday = base_pain
@@ -147,7 +167,105 @@ def generate_patient_trajectory(patient_profile, config):
         })
     return records
 
-def calculate_crisis_probability(df, config):
+def generate_cohort(config, rng=None, first_patient_id=1, num_patients=None):
+    """Generates profiles and trajectories for the whole cohort at once.
+
+    Produces the same columns, in the same order, as merging the records of
+    generate_patient_trajectory with generate_patient_profiles, but keeps
+    state as arrays over all patients: only the pain AR(1) process loops,
+    once per day, and every other value is drawn in bulk. Values come from
+    ``rng`` (a NumPy Generator), so the random stream differs from the
+    per-patient generator while the distributions match (see test_simulate.py).
+    A slice of a larger cohort is generated by passing ``first_patient_id``
+    and ``num_patients``.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    if num_patients is None:
+        num_patients = config['simulation_params']['num_patients']
+    num_days = config['simulation_params']['days_per_patient']
+    p_params = config['patient_profile_params']
+    e_params = config['event_params']
+    shape = (num_patients, num_days)
+
+    def bernoulli(prob):
+        return (rng.random(shape) < prob).astype(np.int64)
+
+    # --- Static profiles ---
+    sexes = list(p_params['sex_distribution'].keys())
+    genotypes = list(p_params['genotype_distribution'].keys())
+    age = rng.integers(p_params['age_range'][0], p_params['age_range'][1], num_patients)
+    sex = np.array(sexes)[rng.choice(len(sexes), num_patients, p=list(p_params['sex_distribution'].values()))]
+    genotype_idx = rng.choice(len(genotypes), num_patients, p=list(p_params['genotype_distribution'].values()))
+    history_acs = rng.binomial(1, p_params['history_acs_prob'], num_patients)
+    asthma = rng.binomial(1, p_params['asthma_prob'], num_patients)
+    baseline = {
+        key: np.array([GENOTYPE_BASELINES[g][key] for g in genotypes], dtype=float)[genotype_idx]
+        for key in ('wbc', 'ldh', 'hbf')
+    }
+    baseline_wbc = rng.normal(baseline['wbc'], 2)
+    baseline_ldh = rng.normal(baseline['ldh'], 50)
+    hbf_percent = rng.normal(baseline['hbf'], 2)
+
+    # --- Per-patient trajectory parameters ---
+    pain_mod = np.array([GENOTYPE_PAIN_MOD.get(g, 1.0) for g in genotypes])[genotype_idx]
+    base_pain = rng.uniform(0, 3, num_patients) + pain_mod
+    adherence_prob = rng.uniform(0.5, 0.95, num_patients)
+    hydroxyurea_prob = rng.uniform(0.4, 0.7, num_patients)
+    pain_med_prob = rng.uniform(0.3, 0.8, num_patients)
+
+    # --- Pain AR(1): the only day-by-day loop ---
+    alpha = config['temporal_params']['pain_memory_alpha']
+    pain_noise = rng.normal(0, 0.5, shape)
+    pain = np.empty(shape)
+    pain_yesterday = base_pain
+    for day in range(num_days):
+        pain[:, day] = np.clip(np.round(alpha * pain_yesterday + (1-alpha) * base_pain + pain_noise[:, day]), 0, 10)
+        pain_yesterday = pain[:, day]
+    pain_fraction = pain / 10
+
+    # --- Everything else, drawn for all patient-days at once ---
+    days = np.arange(1, num_days + 1)
+    fever_increase = np.where(np.isin(days, list(e_params['flu_season_days'])), e_params['flu_season_fever_increase'], 0)
+    prob_fever = 0.02 + pain_fraction * 0.3 + fever_increase
+    crp = rng.uniform(1, 5, shape) + bernoulli(prob_fever) * rng.uniform(20, 100, shape) # Spikes with fever
+    daily_wbc = baseline_wbc[:, None] + rng.normal(0, 1, shape) + pain * 0.5
+    daily_ldh = baseline_ldh[:, None] + rng.normal(0, 20, shape) + pain * 20
+    hydration = np.array(['Low', 'Normal', 'High'])[rng.choice(3, shape, p=[0.2, 0.6, 0.2])]
+
+    trajectory = {
+        'PatientID': np.arange(first_patient_id, first_patient_id + num_patients)[:, None].repeat(num_days, axis=1),
+        'Day': np.broadcast_to(days, shape),
+        'PainLevel': pain.astype(np.int64),
+        'Fatigue': bernoulli(np.clip(0.1 + pain_fraction * 0.6, 0, 1)),
+        'Fever': (crp > 20).astype(np.int64), # Fever is tied to high CRP
+        'JointPain': bernoulli(np.clip(0.05 + pain_fraction * 0.7, 0, 1)),
+        'Dactylitis': bernoulli(np.clip(0.01 + pain_fraction * 0.1, 0, 1)),
+        'Shortness_of_Breath': bernoulli(np.clip(0.02 + pain_fraction * 0.3 + asthma[:, None] * 0.05, 0, 1)),
+        'Sleep_Quality': rng.integers(1, 6, shape) - np.round(pain / 4).astype(np.int64), # Pain affects sleep
+        'Reported_Stress_Level': rng.integers(1, 6, shape) + np.round(pain / 5).astype(np.int64),
+        'HydrationLevel': hydration,
+        'MedicationAdherence': bernoulli(adherence_prob[:, None]),
+        'WBC_Count': np.round(daily_wbc, 2),
+        'LDH': np.round(daily_ldh, 2),
+        'CRP': np.round(crp, 2),
+        'Temperature': np.round(rng.uniform(*e_params['weather_temp_range'], shape), 1),
+        'Humidity': np.round(rng.uniform(*e_params['weather_humidity_range'], shape), 1),
+        'Hydroxyurea': bernoulli(hydroxyurea_prob[:, None]),
+        'PainMed': bernoulli(pain_med_prob[:, None]),
+        'PriorCrises': np.zeros(shape, dtype=np.int64) # Updated after crisis assignment
+    }
+    profile = {
+        'Age': age, 'Sex': sex, 'Genotype': np.array(genotypes)[genotype_idx],
+        'History_of_ACS': history_acs, 'Coexisting_Asthma': asthma,
+        'Baseline_WBC': baseline_wbc, 'Baseline_LDH': baseline_ldh, 'HbF_percent': hbf_percent
+    }
+
+    # Patient-major order, as one trajectory after another
+    columns = {name: np.asarray(values).ravel() for name, values in trajectory.items()}
+    columns.update({name: np.repeat(values, num_days) for name, values in profile.items()})
+    return pd.DataFrame(columns)
+
+def calculate_crisis_probability(df, config, rng=None):
     """Calculates crisis probability using the comprehensive risk model."""
     w = config['risk_model_weights']
     df['hydration_score'] = df['HydrationLevel'].map({'Low': w['hydration_low'], 'Normal': 0, 'High': -0.1})
@@ -171,63 +289,214 @@ def calculate_crisis_probability(df, config):
         df['temp_score'] + df['humidity_score'] +
         df['hydroxyurea_score'] + df['painmed_score']
     )
-    noise = np.random.normal(0, 0.1, len(df))
-    df['P_Crisis'] = (logit + noise).apply(sigmoid)
+    noise = (rng if rng is not None else np.random).normal(0, 0.1, len(df))
+    df['P_Crisis'] = sigmoid_array(logit + noise)
     return df
 
-def assign_labels_dynamically(df):
-    """Assigns binary class labels based on the median probability."""
-    prob_threshold = df['P_Crisis'].median()
-    print(f"Dynamic Probability Threshold (Median): {prob_threshold:.4f}")
+def assign_labels_dynamically(df, prob_threshold=None):
+    """Assigns binary class labels based on the median probability, or on a given threshold."""
+    if prob_threshold is None:
+        prob_threshold = df['P_Crisis'].median()
+        print(f"Dynamic Probability Threshold (Median): {prob_threshold:.4f}")
     df['CrisisLikely'] = (df['P_Crisis'] > prob_threshold).astype(int)
     # --- Temporal Crisis Window: Flag if crisis likely in next 48h (next 2 days) ---
-    df['CrisisNext48h'] = 0
-    for pid in df['PatientID'].unique():
-        patient_df = df[df['PatientID'] == pid]
-        crisis_idx = patient_df.index[patient_df['CrisisLikely'] == 1].tolist()
-        for idx in crisis_idx:
-            # Flag previous 2 days as "crisis window"
-            for offset in range(1, 3):
-                prev_idx = idx - offset
-                if prev_idx in patient_df.index:
-                    df.at[prev_idx, 'CrisisNext48h'] = 1
+    # Rows are ordered by patient, then index label; the row labelled idx-1 or
+    # idx-2 of the same patient can then only sit 1 or 2 positions before idx
+    patient_ids = df['PatientID'].to_numpy()
+    labels = df.index.to_numpy()
+    if df['PatientID'].is_monotonic_increasing and df.index.is_monotonic_increasing:
+        order = np.arange(len(df))
+    else:
+        order = np.lexsort((labels, patient_ids))
+    patient_ids, labels = patient_ids[order], labels[order]
+    crisis = df['CrisisLikely'].to_numpy()[order] == 1
+    window = np.zeros(len(df), dtype=bool)
+    for offset in range(1, 3):
+        # Flag previous 2 days as "crisis window"
+        earlier = (patient_ids[offset:] == patient_ids[:-offset]) & (labels[offset:] - labels[:-offset] <= 2)
+        window[:-offset] |= earlier & crisis[offset:]
+    crisis_next_48h = np.zeros(len(df), dtype=np.int64)
+    crisis_next_48h[order] = window
+    df['CrisisNext48h'] = crisis_next_48h
     # --- Update PriorCrises (rolling sum up to previous day) ---
-    df['PriorCrises'] = 0
-    for pid in df['PatientID'].unique():
-        patient_mask = df['PatientID'] == pid
-        crisis_cumsum = df.loc[patient_mask, 'CrisisLikely'].cumsum().shift(1).fillna(0)
-        df.loc[patient_mask, 'PriorCrises'] = crisis_cumsum.astype(int)
+    crisis_cumsum = df.groupby('PatientID', sort=False)['CrisisLikely'].cumsum()
+    df['PriorCrises'] = (crisis_cumsum - df['CrisisLikely']).astype(int)
     return df
 
-def introduce_missing_data(df, config):
-    """Randomly introduces missing values into the dataset."""
+def introduce_missing_data(df, config, rng=None, copy=True):
+    """Randomly introduces missing values into the dataset.
+
+    Affected numeric columns always become float, even when no value was
+    removed, so shards written separately share one schema.
+    """
+    rng = rng if rng is not None else np.random
     params = config['missing_data_params']
-    df_missing = df.copy()
+    df_missing = df.copy() if copy else df
     for col in params['columns_to_affect']:
         if col in df_missing.columns:
-            mask = np.random.rand(len(df_missing)) < params['fraction_missing']
+            if df_missing[col].dtype.kind in 'biu':
+                df_missing[col] = df_missing[col].astype(float)
+            mask = rng.random(len(df_missing)) < params['fraction_missing']
             df_missing.loc[mask, col] = np.nan
     return df_missing
 
-def main(config):
-    """Main function to generate and display the comprehensive dataset."""
+# Intermediate columns of calculate_crisis_probability left out of the output
+SCORE_COLUMNS = ['hydration_score', 'sleep_score', 'stress_score', 'temp_score', 'humidity_score', 'hydroxyurea_score', 'painmed_score']
+
+def plan_shards(config):
+    """Splits the cohort into fixed-size shards, each with its own seed.
+
+    Returns the master SeedSequence and a list of (first_patient_id,
+    num_patients, seed) tuples. Shard boundaries and seeds depend only on the
+    config, never on the number of workers.
+    """
+    sim_params = config['simulation_params']
+    master = np.random.SeedSequence(sim_params.get('seed'))
+    num_patients = sim_params['num_patients']
+    shard_size = sim_params.get('shard_size') or num_patients
+    starts = range(0, num_patients, shard_size)
+    seeds = master.spawn(len(starts))
+    shards = [(start + 1, min(shard_size, num_patients - start), seed) for start, seed in zip(starts, seeds)]
+    return master, shards
+
+def simulate_shard(config, first_patient_id, num_patients, seed, label_threshold=None):
+    """Generates one scored shard with missing values, from the shard's own random stream.
+
+    Without ``label_threshold`` the crisis probability is kept in P_Crisis
+    and labels are left to the caller, since the median threshold needs the
+    whole cohort. With it, the shard is labeled here: a shard holds whole
+    patients, so the 48h window and PriorCrises never cross shards. Missing
+    values never touch P_Crisis or the label columns, so injecting them
+    before labeling gives the same result as after.
+    """
+    rng = np.random.default_rng(seed)
+    shard = generate_cohort(config, rng, first_patient_id=first_patient_id, num_patients=num_patients)
+    shard = calculate_crisis_probability(shard, config, rng).drop(columns=SCORE_COLUMNS)
+    shard = introduce_missing_data(shard, config, rng, copy=False)
+    if label_threshold is not None:
+        shard = assign_labels_dynamically(shard, label_threshold).drop(columns=['P_Crisis'])
+    return shard
+
+def map_shards(func, config, shards, workers, *args):
+    """Yields func(config, *shard, *args) for each shard in order, with at most 2 x workers shards in flight."""
+    if workers <= 1 or len(shards) <= 1:
+        for shard in shards:
+            yield func(config, *shard, *args)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for shard in shards:
+            pending.append(pool.submit(func, config, *shard, *args))
+            if len(pending) > 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def simulate_cohort(config, workers=None):
+    """Generates the labeled cohort shard by shard, optionally on a process pool.
+
+    For a given master seed the output is bit-identical whatever the number
+    of workers. Returns (DataFrame, master SeedSequence).
+    """
+    workers = workers or config['simulation_params'].get('workers') or 1
+    master, shards = plan_shards(config)
+    full_df = pd.concat(map_shards(simulate_shard, config, shards, workers), ignore_index=True)
+    full_df = assign_labels_dynamically(full_df, config['simulation_params'].get('label_threshold'))
+    return full_df.drop(columns=['P_Crisis']), master
+
+class CohortWriter:
+    """Writes shards as one appended CSV file or as numbered Parquet files in a directory."""
+
+    def __init__(self, path, file_format):
+        self.path = path
+        self.file_format = file_format
+        self.rows = 0
+        self.parts = 0
+        if file_format == 'parquet':
+            try:
+                import pyarrow
+            except ImportError:
+                raise SystemExit("Writing Parquet requires pyarrow (pip install pyarrow)")
+            os.makedirs(path, exist_ok=True)
+            # Parts of an earlier run would otherwise be read as part of this cohort
+            for stale in glob.glob(os.path.join(path, 'part-*.parquet')):
+                os.remove(stale)
+
+    def write(self, shard):
+        if self.file_format == 'csv':
+            shard.to_csv(self.path, mode='w' if self.parts == 0 else 'a', header=self.parts == 0, index=False)
+        else:
+            shard.to_parquet(os.path.join(self.path, f'part-{self.parts:05d}.parquet'), index=False)
+        self.rows += len(shard)
+        self.parts += 1
+
+def write_cohort(config, path, file_format='csv', workers=None):
+    """Generates the cohort shard by shard and writes each shard as soon as it is ready.
+
+    Only a few shards are held in memory at a time, so the cohort may be
+    larger than RAM. Labels need the configured label_threshold, since the
+    cohort median would mean holding every P_Crisis value; the rows written
+    match simulate_cohort for the same config. Returns run statistics.
+    """
+    threshold = config['simulation_params'].get('label_threshold')
+    if threshold is None:
+        raise ValueError("Streaming a cohort needs a fixed label_threshold (--label-threshold)")
+    workers = workers or config['simulation_params'].get('workers') or 1
+    master, shards = plan_shards(config)
+    writer = CohortWriter(path, file_format)
+    crises = 0
+    for shard in map_shards(simulate_shard, config, shards, workers, threshold):
+        writer.write(shard)
+        crises += int(shard['CrisisLikely'].sum())
+    return {
+        'rows': writer.rows,
+        'shards': writer.parts,
+        'threshold': threshold,
+        'seed': master.entropy,
+        'crisis_rate': crises / writer.rows if writer.rows else 0.0
+    }
+
+def resolve_output_format(output_file, file_format=None):
+    """Returns the format to stream output_file in, or None without one.
+
+    Raises ValueError for --format without --output, and for an output
+    whose format is neither given nor told by a .csv or .parquet name.
+    """
+    if output_file is None:
+        if file_format is not None:
+            raise ValueError("--format only applies together with --output")
+        return None
+    name = output_file.lower().rstrip('/\\')
+    if file_format is None:
+        if name.endswith('.csv'):
+            return 'csv'
+        if name.endswith('.parquet'):
+            return 'parquet'
+        raise ValueError(f"Cannot tell the format of {output_file}; name it *.csv or *.parquet, or pass --format")
+    if file_format == 'parquet' and name.endswith('.csv'):
+        raise ValueError(f"--format parquet writes a directory of parts, not the CSV file {output_file}")
+    return file_format
+
+def main(config, output_file=None, file_format=None):
+    """Main function to generate and display the comprehensive dataset.
+
+    With ``output_file`` the cohort is streamed to disk shard by shard
+    (CSV, or a directory of Parquet parts) instead of built in memory.
+    """
+    file_format = resolve_output_format(output_file, file_format)
     print("Starting comprehensive clinical simulation...")
     
-    patient_profiles = generate_patient_profiles(config)
+    if output_file is not None:
+        stats = write_cohort(config, output_file, file_format)
+        print(f"Master seed: {stats['seed']}")
+        print(f"Probability threshold: {stats['threshold']:.4f}")
+        print(f"\nSuccessfully generated {stats['rows']} patient-day records in {stats['shards']} shards.")
+        print(f"Crisis rate: {stats['crisis_rate']:.3f}")
+        print(f"\nData saved to {output_file}")
+        return
     
-    all_records = []
-    for _, profile in patient_profiles.iterrows():
-        all_records.extend(generate_patient_trajectory(profile, config))
-    
-    trajectories_df = pd.DataFrame(all_records)
-    full_df = pd.merge(trajectories_df, patient_profiles, on='PatientID')
-    
-    full_df = calculate_crisis_probability(full_df, config)
-    full_df = assign_labels_dynamically(full_df)
-    
-    final_df = full_df.drop(columns=['hydration_score', 'sleep_score', 'stress_score', 'P_Crisis', 'temp_score', 'humidity_score', 'hydroxyurea_score', 'painmed_score'])
-
-    final_df_with_missing = introduce_missing_data(final_df, config)
+    final_df_with_missing, master = simulate_cohort(config)
+    print(f"Master seed: {master.entropy}")
 
     print(f"\nSuccessfully generated {len(final_df_with_missing)} patient-day records.")
 
@@ -246,4 +515,29 @@ def main(config):
     print(f"\nData saved to {output_file}")
 
 if __name__ == "__main__":
-    main(CONFIG)
+    parser = argparse.ArgumentParser(description="Simulate a sickle cell patient cohort")
+    parser.add_argument('--patients', type=int, default=None, help="Number of patients")
+    parser.add_argument('--seed', type=int, default=None, help="Master seed for a reproducible cohort")
+    parser.add_argument('--workers', type=int, default=None, help="Processes generating shards in parallel")
+    parser.add_argument('--label-threshold', type=float, default=None,
+                        help="Fixed P_Crisis threshold for labels (default: the cohort median); required with --output")
+    parser.add_argument('--output', default=None,
+                        help="Stream shards to this .csv file or .parquet directory instead of building the cohort in memory")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default=None,
+                        help="Output format for --output (default: from its .csv or .parquet name)")
+    args = parser.parse_args()
+    try:
+        resolve_output_format(args.output, args.format)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.output is not None and args.label_threshold is None:
+        parser.error("--output streams the cohort shard by shard and needs --label-threshold")
+    if args.patients is not None:
+        CONFIG['simulation_params']['num_patients'] = args.patients
+    if args.seed is not None:
+        CONFIG['simulation_params']['seed'] = args.seed
+    if args.workers is not None:
+        CONFIG['simulation_params']['workers'] = args.workers
+    if args.label_threshold is not None:
+        CONFIG['simulation_params']['label_threshold'] = args.label_threshold
+    main(CONFIG, args.output, args.format)
@@ -0,0 +1,164 @@
+"""
+In-process microbenchmarks for the prediction hot path.
+
+Times each stage on its own against the bundled model pickle, so a
+regression in one function shows up even when the HTTP numbers hide it:
+
+    python stage_benchmark.py                  # compare with stage_baseline.json
+    python stage_benchmark.py --stage features # only stages whose name contains 'features'
+    python stage_benchmark.py --update         # record a new baseline
+
+Every stage is run in loops long enough to time reliably (see
+timeit.Timer.autorange) and the median time per call over several repeats
+is reported. Inputs are rows of the simulated dataset whose categories the
+model's label encoders know.
+"""
+
+import argparse
+import os
+import platform
+import statistics
+import time
+import timeit
+
+# The benchmark measures scoring, not the response cache
+os.environ['AETHERFLOW_CACHE_SIZE'] = '0'
+os.environ.setdefault('AETHERFLOW_READY_LINE', '0')
+
+import numpy as np
+import pandas as pd
+
+import inference_api as api
+from benchmark_utils import check_above, check_baseline, load_baseline, write_baseline
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(MODEL_DIR, 'stage_baseline.json')
+SIMULATED_DATA_PATH = os.path.join(MODEL_DIR, 'sickle_cell_crisis_simulated.csv')
+
+# Rows in the large inputs
+LARGE_ROWS = 10000
+
+# Allowed slowdown against the baseline before the check fails
+DEFAULT_TOLERANCE = 0.5
+
+# Timed repeats per stage (the median is reported)
+DEFAULT_REPEATS = 7
+
+def load_inputs(package, rows=LARGE_ROWS, seed=0):
+    """Return a training-style frame of `rows` simulated patients the encoders can encode."""
+    data = pd.read_csv(SIMULATED_DATA_PATH)
+    frame = data[list(api.FIELD_MAPPING.values())]
+    known = np.ones(len(frame), dtype=bool)
+    for col in api.CATEGORICAL_COLUMNS:
+        known &= frame[col].astype(str).isin(package['label_encoders'][col].classes_).to_numpy()
+    frame = frame[known]
+    return frame.sample(n=rows, replace=len(frame) < rows, random_state=seed).reset_index(drop=True)
+
+def build_stages(model_path):
+    """Return {stage name: zero-argument callable} for every benchmarked stage."""
+    package = api.load_model_package(model_path)
+    runtime = api.build_model_runtime(model_path, api.canonical_model_key())
+
+    raw = load_inputs(package)
+    one_row = raw.iloc[:1].copy()
+    engineered = api.create_advanced_features(raw.copy())
+    encoded = engineered.copy()
+    for col in api.CATEGORICAL_COLUMNS:
+        encoded[col] = package['label_encoders'][col].transform(encoded[col].astype(str))
+    X = encoded[package['feature_names']]
+    X_processed = package['preprocessor'].transform(X)
+    if package.get('feature_selector') is not None:
+        X_processed = package['feature_selector'].transform(X_processed)
+
+    def label_encoding():
+        for col in api.CATEGORICAL_COLUMNS:
+            package['label_encoders'][col].transform(engineered[col].astype(str))
+
+    columns = {col: raw[col].to_numpy(dtype=str if col in api.CATEGORICAL_COLUMNS else float) for col in raw.columns}
+    if runtime.fused_scorer is not None:
+        feature_row = runtime.fused_scorer.feature_matrix(columns)[0]
+    else:
+        feature_row = X.to_numpy(dtype=float)[0]
+    patient = api.PatientData(**api.SMOKE_TEST_PATIENT)
+
+    stages = {
+        'create_advanced_features_1row': lambda: api.create_advanced_features(one_row.copy()),
+        f'create_advanced_features_{LARGE_ROWS // 1000}k': lambda: api.create_advanced_features(raw.copy()),
+        f'label_encoding_{LARGE_ROWS // 1000}k': label_encoding,
+        f'preprocessor_transform_{LARGE_ROWS // 1000}k': lambda: package['preprocessor'].transform(X),
+        f'predict_proba_{LARGE_ROWS // 1000}k': lambda: package['model'].predict_proba(X_processed),
+        'get_top_risk_factors': lambda: api.get_top_risk_factors(runtime, feature_row),
+        'get_recommendations': lambda: api.get_recommendations(0.8, patient)
+    }
+    if runtime.fused_scorer is not None:
+        stages[f'fused_scorer_{LARGE_ROWS // 1000}k'] = lambda: runtime.fused_scorer.predict_proba(
+            runtime.fused_scorer.feature_matrix(columns)
+        )
+    return stages
+
+def time_stage(func, repeats):
+    """Return the median seconds per call of func."""
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    return statistics.median(seconds / loops for seconds in timer.repeat(repeat=repeats, number=loops))
+
+def time_predict_crisis(repeats, calls=200):
+    """Median seconds per POST /predict through FastAPI's TestClient, after the model is ready."""
+    from fastapi.testclient import TestClient
+
+    with TestClient(api.app) as client:
+        started = time.perf_counter()
+        while client.get('/ready').status_code != 200:
+            if time.perf_counter() - started > 120:
+                raise RuntimeError("Model did not become ready within 120s")
+            time.sleep(0.05)
+
+        def run():
+            for _ in range(calls):
+                response = client.post('/predict', json=api.SMOKE_TEST_PATIENT)
+                if response.status_code != 200:
+                    raise RuntimeError(f"/predict returned {response.status_code}: {response.text}")
+
+        run()
+        return statistics.median(timeit.repeat(run, repeat=repeats, number=1)) / calls
+
+def compare(result, baseline, tolerance):
+    """Return a list of regressions of result against baseline."""
+    expected = baseline.get('stages_us', {})
+    problems = [check_above(stage, us, expected.get(stage), tolerance, ' us') for stage, us in result['stages_us'].items()]
+    return [problem for problem in problems if problem]
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the stages of the prediction path")
+    parser.add_argument('--model', default=None, help="Model to use, as name or name@version")
+    parser.add_argument('--stage', default=None, help="Only run stages whose name contains this text")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="Timed repeats per stage")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown, e.g. 0.5")
+    parser.add_argument('--update', action='store_true', help="Write the results as the new baseline")
+    args = parser.parse_args()
+
+    stages = build_stages(api.get_model_path(args.model))
+    timings = {}
+    for name, func in stages.items():
+        if args.stage and args.stage not in name:
+            continue
+        timings[name] = time_stage(func, args.repeats) * 1e6
+        print(f"{name:<36} {timings[name]:12.1f} us")
+    if not args.stage or args.stage in 'predict_crisis':
+        timings['predict_crisis'] = time_predict_crisis(args.repeats) * 1e6
+        print(f"{'predict_crisis':<36} {timings['predict_crisis']:12.1f} us")
+
+    result = {'stages_us': {name: round(us, 2) for name, us in timings.items()}, 'python': platform.python_version()}
+
+    if args.update:
+        # With --stage only the stages that ran are replaced
+        baseline = (load_baseline(BASELINE_PATH) if args.stage else None) or {}
+        baseline.setdefault('stages_us', {}).update(result['stages_us'])
+        baseline['python'] = result['python']
+        write_baseline(BASELINE_PATH, baseline)
+        return
+
+    check_baseline(result, load_baseline(BASELINE_PATH), compare, args.tolerance, "All stages within baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Startup benchmark for the inference server.
+
+Measures how long `import inference_api` takes, broken down by the modules
+it imports directly (the same numbers `python -X importtime` prints), and
+checks that the heavy modules kept off the serving path are not imported.
+Optionally also times a real server from launch to the first /health answer.
+
+    python startup_benchmark.py              # compare with startup_baseline.json
+    python startup_benchmark.py --serve      # also time launch -> /health
+    python startup_benchmark.py --update     # record a new baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmark_utils import check_above, check_baseline, free_port, load_baseline, write_baseline
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(MODEL_DIR, 'startup_baseline.json')
+
+# Modules that must not be imported just by importing the server
+DEFERRED_MODULES = ['pandas', 'sklearn', 'joblib', 'scipy', 'uvicorn']
+
+# Allowed slowdown against the baseline before the check fails
+DEFAULT_TOLERANCE = 0.25
+
+# Direct imports listed in the report
+TOP_IMPORTS = 10
+
+CHILD_SCRIPT = (
+    "import json, sys\n"
+    "import inference_api\n"
+    f"print(json.dumps(sorted(m for m in {DEFERRED_MODULES!r} if m in sys.modules)))\n"
+)
+
+def parse_importtime(stderr):
+    """Return (total_us, {direct import: cumulative_us}) for inference_api from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((depth, name.strip(), int(cumulative)))
+
+    # Children are printed before their parent, so walk back from inference_api
+    for position, (depth, name, cumulative) in enumerate(rows):
+        if name == 'inference_api' and depth == 0:
+            break
+    else:
+        raise RuntimeError("inference_api not found in -X importtime output")
+
+    direct = {}
+    for child_depth, child_name, child_cumulative in reversed(rows[:position]):
+        if child_depth == 0:
+            break
+        if child_depth == 1:
+            direct[child_name] = child_cumulative
+    return cumulative, direct
+
+def measure_import(runs):
+    """Import inference_api in fresh interpreters and return the median timings."""
+    totals = []
+    per_module = {}
+    deferred_loaded = set()
+    env = dict(os.environ, PYTHONWARNINGS='ignore')
+
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT],
+            cwd=MODEL_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        total, direct = parse_importtime(result.stderr)
+        totals.append(total)
+        for name, cumulative in direct.items():
+            per_module.setdefault(name, []).append(cumulative)
+        deferred_loaded.update(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    modules = {name: statistics.median(values) / 1000 for name, values in per_module.items()}
+    top = dict(sorted(modules.items(), key=lambda item: -item[1])[:TOP_IMPORTS])
+    return {
+        'import_ms': statistics.median(totals) / 1000,
+        'top_imports_ms': {name: round(ms, 2) for name, ms in top.items()},
+        'deferred_modules_imported': sorted(deferred_loaded)
+    }
+
+def measure_time_to_health(timeout=60.0):
+    """Launch the server and return milliseconds until /health first answers."""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'inference_api:app', '--host', '127.0.0.1', '--port', str(port)],
+        cwd=MODEL_DIR, env=dict(os.environ, PYTHONWARNINGS='ignore'),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"Server did not answer /health within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def compare(result, baseline, tolerance):
+    """Return a list of regressions of result against baseline."""
+    problems = []
+    if result['deferred_modules_imported']:
+        problems.append(f"deferred modules imported at startup: {', '.join(result['deferred_modules_imported'])}")
+    for key in ('import_ms', 'time_to_health_ms'):
+        if key in result:
+            problems.append(check_above(key, result[key], baseline.get(key), tolerance))
+    return [problem for problem in problems if problem]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure inference server startup time")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to time (median is reported)")
+    parser.add_argument('--serve', action='store_true', help="Also time server launch until /health answers")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown, e.g. 0.25")
+    parser.add_argument('--update', action='store_true', help="Write the results as the new baseline")
+    args = parser.parse_args()
+
+    result = measure_import(args.runs)
+    if args.serve:
+        result['time_to_health_ms'] = measure_time_to_health()
+    result['python'] = platform.python_version()
+
+    print(f"import inference_api: {result['import_ms']:.1f} ms (median of {args.runs})")
+    for name, ms in result['top_imports_ms'].items():
+        print(f"  {name:<36} {ms:8.1f} ms")
+    if 'time_to_health_ms' in result:
+        print(f"launch -> /health: {result['time_to_health_ms']:.1f} ms")
+    print(f"deferred modules imported: {', '.join(result['deferred_modules_imported']) or 'none'}")
+
+    if args.update:
+        write_baseline(BASELINE_PATH, result)
+        return
+
+    check_baseline(result, load_baseline(BASELINE_PATH), compare, args.tolerance, "Startup within baseline")
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,61 @@ from datetime import datetime
 # API base URL
 BASE_URL = "http://localhost:8000"
 
+# Sample patient data, also used by load_test.py
+HIGH_RISK_PATIENT = {
+    "age": 25,
+    "sex": "Female",
+    "genotype": "HbSS",
+    "pain_level": 8,
+    "hbf_percent": 3.5,
+    "wbc_count": 12.5,
+    "ldh": 350,
+    "crp": 15.2,
+    "fatigue": 1,
+    "fever": 1,
+    "joint_pain": 1,
+    "dactylitis": 0,
+    "shortness_of_breath": 1,
+    "prior_crises": 3,
+    "history_of_acs": 1,
+    "coexisting_asthma": 0,
+    "hydroxyurea": 1,
+    "pain_med": 1,
+    "medication_adherence": 0.8,
+    "hydration_level": "Low",
+    "sleep_quality": 3,
+    "reported_stress_level": 8,
+    "temperature": 30,
+    "humidity": 75
+}
+
+LOW_RISK_PATIENT = {
+    "age": 20,
+    "sex": "Male",
+    "genotype": "HbSC",
+    "pain_level": 2,
+    "hbf_percent": 8.5,
+    "wbc_count": 7.2,
+    "ldh": 200,
+    "crp": 2.1,
+    "fatigue": 0,
+    "fever": 0,
+    "joint_pain": 0,
+    "dactylitis": 0,
+    "shortness_of_breath": 0,
+    "prior_crises": 0,
+    "history_of_acs": 0,
+    "coexisting_asthma": 0,
+    "hydroxyurea": 1,
+    "pain_med": 0,
+    "medication_adherence": 0.95,
+    "hydration_level": "High",
+    "sleep_quality": 5,
+    "reported_stress_level": 2,
+    "temperature": 22,
+    "humidity": 45
+}
+
 def test_health_check():
     """Test the health check endpoint."""
     print("Testing health check endpoint...")
@@ -29,37 +84,9 @@ def test_prediction():
     """Test the prediction endpoint with sample data."""
     print("\nTesting prediction endpoint...")
     
-    # Sample patient data for testing
-    test_patient = {
-        "age": 25,
-        "sex": "Female",
-        "genotype": "HbSS",
-        "pain_level": 8,
-        "hbf_percent": 3.5,
-        "wbc_count": 12.5,
-        "ldh": 350,
-        "crp": 15.2,
-        "fatigue": 1,
-        "fever": 1,
-        "joint_pain": 1,
-        "dactylitis": 0,
-        "shortness_of_breath": 1,
-        "prior_crises": 3,
-        "history_of_acs": 1,
-        "coexisting_asthma": 0,
-        "hydroxyurea": 1,
-        "pain_med": 1,
-        "medication_adherence": 0.8,
-        "hydration_level": "Low",
-        "sleep_quality": 3,
-        "reported_stress_level": 8,
-        "temperature": 30,
-        "humidity": 75
-    }
-    
     response = requests.post(
         f"{BASE_URL}/predict",
-        json=test_patient,
+        json=HIGH_RISK_PATIENT,
         headers={"Content-Type": "application/json"}
     )
     
@@ -84,36 +111,9 @@ def test_low_risk_patient():
     """Test with a low-risk patient profile."""
     print("\nTesting low-risk patient...")
     
-    low_risk_patient = {
-        "age": 20,
-        "sex": "Male",
-        "genotype": "HbSC",
-        "pain_level": 2,
-        "hbf_percent": 8.5,
-        "wbc_count": 7.2,
-        "ldh": 200,
-        "crp": 2.1,
-        "fatigue": 0,
-        "fever": 0,
-        "joint_pain": 0,
-        "dactylitis": 0,
-        "shortness_of_breath": 0,
-        "prior_crises": 0,
-        "history_of_acs": 0,
-        "coexisting_asthma": 0,
-        "hydroxyurea": 1,
-        "pain_med": 0,
-        "medication_adherence": 0.95,
-        "hydration_level": "High",
-        "sleep_quality": 5,
-        "reported_stress_level": 2,
-        "temperature": 22,
-        "humidity": 45
-    }
-    
     response = requests.post(
         f"{BASE_URL}/predict",
-        json=low_risk_patient,
+        json=LOW_RISK_PATIENT,
         headers={"Content-Type": "application/json"}
     )
     
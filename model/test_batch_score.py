@@ -0,0 +1,83 @@
+"""
+Round-trip test for the offline batch scorer.
+
+A slice of the simulated data goes through the batch_score.py command line
+and through /predict/batch; the probabilities must agree, and rows the
+model cannot encode get an error instead of a score.
+
+    python -m pytest test_batch_score.py
+"""
+
+import csv
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('AETHERFLOW_READY_LINE', '0')
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import inference_api as api
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+SIMULATED_DATA_PATH = os.path.join(MODEL_DIR, 'sickle_cell_crisis_simulated.csv')
+
+# Simulated rows scored, rows per chunk, and the largest allowed difference
+# from the API's probability
+ROUND_TRIP_ROWS = 600
+CHUNK_SIZE = 250
+PARITY_TOLERANCE = 1e-9
+
+@pytest.fixture(scope='module')
+def client():
+    with TestClient(api.app) as client:
+        started = time.perf_counter()
+        while client.get('/ready').status_code != 200:
+            assert time.perf_counter() - started < 120, "Model did not become ready"
+            time.sleep(0.05)
+        yield client
+
+def test_csv_round_trip_matches_batch_endpoint(client, tmp_path):
+    rows = pd.read_csv(SIMULATED_DATA_PATH, nrows=ROUND_TRIP_ROWS)
+    # A category the label encoders never saw
+    unseen = rows.iloc[[0]].assign(HydrationLevel='Medium')
+    rows = pd.concat([rows, unseen], ignore_index=True)
+    input_path = tmp_path / 'patients.csv'
+    output_path = tmp_path / 'scores.csv'
+    rows.to_csv(input_path, index=False)
+
+    result = subprocess.run(
+        [sys.executable, 'batch_score.py', str(input_path), str(output_path),
+         '--workers', '1', '--chunk-size', str(CHUNK_SIZE)],
+        cwd=MODEL_DIR, capture_output=True, text=True, timeout=300
+    )
+    assert result.returncode == 0, result.stderr
+    scores = pd.read_csv(output_path, keep_default_na=False)
+    assert len(scores) == len(rows)
+    assert (scores['PatientID'].to_numpy() == rows['PatientID'].to_numpy()).all()
+
+    with open(input_path, newline='') as f:
+        records = [
+            {api.CSV_HEADER_ALIASES.get(name, name): value for name, value in row.items() if value != ''}
+            for row in csv.DictReader(f)
+        ]
+    results = client.post('/predict/batch', json=records).json()['results']
+    compared = 0
+    for (_, score), item in zip(scores.iterrows(), results):
+        if item['prediction'] is None:
+            continue
+        assert score['error'] == ''
+        assert float(score['crisis_probability']) == pytest.approx(
+            item['prediction']['crisis_probability'], abs=PARITY_TOLERANCE
+        )
+        assert score['risk_level'] == item['prediction']['risk_level']
+        compared += 1
+    assert compared > 100
+
+    bad = scores.iloc[-1]
+    assert bad['error'] == 'HydrationLevel: unseen label'
+    assert bad['crisis_probability'] == '' and bad['risk_level'] == ''
+    assert results[-1]['error'] == "HydrationLevel: unseen label 'Medium'"
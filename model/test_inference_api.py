@@ -0,0 +1,587 @@
+"""
+In-process tests for the inference API; endpoints are called through
+FastAPI's TestClient.
+
+The columnar batch validator must accept, convert and reject exactly what
+PatientData does, and /predict/batch (served by the fused scorer when the
+model compiles to one) must agree with the sklearn pipeline on the
+simulated data. A reload drops the cached predictions of the old model,
+and a reload from a broken artifact keeps the serving model. The model
+registry loads named and versioned models lazily and evicts the least
+recently used. The micro-batcher hands every caller its own row's
+result, whichever way its batch was flushed, so concurrent /predict calls
+agree with /predict/batch. A full scoring queue answers 503, and the
+process pool scores exactly what the thread pool does. A runtime attached
+to the shared, memory-mapped model state scores bit-identically to one
+loaded from the artifact, and the shared state is removed at exit. The
+/metrics exposition parses and its histograms move with every prediction,
+cache hits included. Streamed uploads keep quoted multi-line CSV fields
+together, and an overlong line, gzip-compressed or not, costs only its own
+result slot. Accept q-values pick the response format, and MessagePack and
+Arrow IPC carry the same predictions as JSON. The signed risk factor
+contributions add up, with the intercept, to the model's logit, and the
+top ones are the largest in magnitude. A worker process hands its
+readiness to the parent only when the parent asked for it, and announces
+itself otherwise.
+
+    python -m pytest test_inference_api.py
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault('AETHERFLOW_READY_LINE', '0')
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+import inference_api as api
+from test_api import HIGH_RISK_PATIENT, LOW_RISK_PATIENT
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+SIMULATED_DATA_PATH = os.path.join(MODEL_DIR, 'sickle_cell_crisis_simulated.csv')
+
+# Simulated rows sent to /predict/batch, and the largest allowed difference
+# from the sklearn pipeline's probability
+PARITY_ROWS = 600
+BATCH_SIZE = 250
+PARITY_TOLERANCE = 1e-9
+
+@pytest.fixture(scope='module')
+def client():
+    with TestClient(api.app) as client:
+        started = time.perf_counter()
+        while client.get('/ready').status_code != 200:
+            assert time.perf_counter() - started < 120, "Model did not become ready"
+            time.sleep(0.05)
+        yield client
+
+EDGE_VALUES = [
+    ('age', '5.0'), ('age', '05'), ('age', '-0'), ('age', '5.'), ('age', '1e1'), ('age', ' 5'),
+    ('age', True), ('age', False), ('age', 5.0), ('age', 5.5), ('age', -1), ('age', 121), ('age', '121'),
+    ('age', math.nan), ('age', math.inf), ('age', 10 ** 30), ('age', None), ('age', [5]),
+    ('pain_level', 10), ('pain_level', 11), ('fever', True), ('fever', 2),
+    ('hbf_percent', '3.5'), ('hbf_percent', '03.5'), ('hbf_percent', '1e2'), ('hbf_percent', True),
+    ('hbf_percent', math.nan), ('hbf_percent', -math.inf), ('hbf_percent', 100), ('hbf_percent', 100.0001),
+    ('ldh', 1e400), ('ldh', -0.0), ('temperature', -40), ('temperature', math.inf),
+    ('sex', 'male'), ('sex', 'F'), ('sex', 'x'), ('sex', 1), ('genotype', 'HbS-Beta'), ('genotype', 'hbss'),
+    ('hydration_level', 'MEDIUM'), ('hydration_level', 'Normal'), ('hydration_level', None)
+]
+
+@pytest.mark.parametrize('field, value', EDGE_VALUES)
+def test_columnar_validation_matches_pydantic(field, value):
+    record = dict(HIGH_RISK_PATIENT, **{field: value})
+    batch, indices, errors = api.validate_records([record, dict(LOW_RISK_PATIENT)])
+    try:
+        expected = api.PatientData.parse_obj(record).dict()
+    except ValidationError as e:
+        assert indices == [1]
+        assert errors[0] == api.format_validation_error(e)
+        return
+    assert 0 in indices and errors[0] is None
+    row = batch.row(indices.index(0))
+    for name, value in expected.items():
+        if isinstance(value, str):
+            assert getattr(row, name) == value, name
+        else:
+            assert float(getattr(row, name)) == float(value), name
+
+def test_missing_field_and_bad_records_match_pydantic():
+    missing = {name: value for name, value in HIGH_RISK_PATIENT.items() if name != 'ldh'}
+    batch, indices, errors = api.validate_records([missing, 'not a record', ValueError('Invalid JSON: x')])
+    assert len(batch) == 0 and indices == []
+    for record, error in zip([missing, 'not a record'], errors):
+        with pytest.raises(ValidationError) as raised:
+            api.PatientData.parse_obj(record)
+        assert error == api.format_validation_error(raised.value)
+    assert errors[2] == 'Invalid JSON: x'
+
+def load_simulated_records(limit):
+    """The first simulated CSV rows as the text records a CSV upload produces."""
+    with open(SIMULATED_DATA_PATH, newline='') as f:
+        reader = csv.DictReader(f)
+        return [
+            {api.CSV_HEADER_ALIASES.get(name, name): value for name, value in row.items() if value != ''}
+            for _, row in zip(range(limit), reader)
+        ]
+
+def test_batch_matches_sklearn_pipeline(client):
+    runtime = api.model_registry.get(api.canonical_model_key())
+    assert runtime.fused_scorer is not None
+    package = api.load_model_package(api.get_model_path())
+    records = load_simulated_records(PARITY_ROWS)
+
+    results = []
+    for start in range(0, len(records), BATCH_SIZE):
+        chunk = records[start:start + BATCH_SIZE]
+        response = client.post('/predict/batch', json=chunk)
+        assert response.status_code == 200
+        assert [item['index'] for item in response.json()['results']] == list(range(len(chunk)))
+        results.extend(response.json()['results'])
+
+    scored = [(item, record) for item, record in zip(results, records) if item['prediction'] is not None]
+    assert len(scored) > 100
+    patients = [api.PatientData.parse_obj(record) for _, record in scored]
+    _, expected = api.score_frame_with_pipeline(package, api.patients_to_dataframe(patients))
+    probabilities = np.array([item['prediction']['crisis_probability'] for item, _ in scored])
+    np.testing.assert_allclose(probabilities, expected, rtol=0, atol=PARITY_TOLERANCE)
+    for (item, _), probability in zip(scored, expected):
+        assert item['prediction']['risk_level'] == api.get_risk_level(probability)
+
+    # Every rejected row is one PatientData rejects too, or one the encoders cannot encode
+    for item, record in zip(results, records):
+        if item['prediction'] is not None:
+            continue
+        try:
+            patient = api.PatientData.parse_obj(record)
+        except ValidationError as e:
+            assert item['error'] == api.format_validation_error(e)
+            continue
+        assert api.find_unseen_labels(runtime, [patient]) == [item['error']]
+
+def admin_headers():
+    return {'X-Admin-Token': api.ADMIN_TOKEN} if api.ADMIN_TOKEN else {}
+
+def cache_stats(client):
+    return client.get('/stats').json()['prediction_cache']
+
+def test_reload_invalidates_cached_predictions(client):
+    if not api.prediction_cache.enabled:
+        pytest.skip("prediction cache disabled")
+    first = client.post('/predict', json=HIGH_RISK_PATIENT)
+    before = cache_stats(client)
+    second = client.post('/predict', json=HIGH_RISK_PATIENT)
+    after_hit = cache_stats(client)
+    assert first.status_code == second.status_code == 200
+    assert after_hit['hits'] == before['hits'] + 1
+    assert second.json()['crisis_probability'] == first.json()['crisis_probability']
+    assert after_hit['approx_bytes'] >= len(first.content)
+
+    previous_generation = api.model_registry.get(api.canonical_model_key()).generation
+    response = client.post('/admin/reload', headers=admin_headers())
+    assert response.status_code == 200
+    after_reload = cache_stats(client)
+    assert after_reload['entries'] == 0
+    assert after_reload['invalidations'] >= after_hit['invalidations'] + 1
+    assert api.model_registry.get(api.canonical_model_key()).generation != previous_generation
+
+    third = client.post('/predict', json=HIGH_RISK_PATIENT)
+    assert third.status_code == 200
+    assert cache_stats(client)['misses'] == after_reload['misses'] + 1
+    assert third.json()['crisis_probability'] == pytest.approx(first.json()['crisis_probability'], abs=PARITY_TOLERANCE)
+
+@pytest.mark.parametrize('artifact', ['corrupt', 'missing'])
+def test_failed_reload_keeps_serving_model(client, monkeypatch, tmp_path, artifact):
+    key = api.canonical_model_key()
+    serving = api.model_registry.get(key)
+    expected = client.post('/predict', json=HIGH_RISK_PATIENT).json()['crisis_probability']
+
+    broken_path = tmp_path / 'enhanced_sickle_cell_model.pkl'
+    if artifact == 'corrupt':
+        broken_path.write_bytes(b'not a pickle')
+    monkeypatch.setattr(api, 'get_model_path', lambda key=None: str(broken_path))
+
+    response = client.post('/admin/reload', headers=admin_headers())
+    assert response.status_code == 500
+    assert response.json()['detail'].startswith('Model reload failed')
+    assert api.model_registry.get(key) is serving
+
+    response = client.post('/predict', json=HIGH_RISK_PATIENT)
+    assert response.status_code == 200
+    assert response.json()['crisis_probability'] == expected
+    assert response.json()['model_version'] == serving.model_version
+
+def test_registry_evicts_least_recently_used_and_reloads():
+    registry = api.ModelRegistry(capacity=2)
+    keys = [api.canonical_model_key(name) for name in ('enhanced', 'baseline', 'enhanced@backup')]
+    assert keys == ['enhanced@latest', 'baseline@latest', 'enhanced@backup']
+    assert registry.get(keys[0]) is None
+
+    first = registry.load(keys[0])
+    second = registry.load(keys[1])
+    assert registry.load(keys[0]) is first
+    # keys[0] was used last, so loading a third model evicts keys[1]
+    third = registry.load(keys[2])
+    assert [runtime.model_key for runtime in registry.resident()] == [keys[0], keys[2]]
+    assert not registry.contains(keys[1])
+    assert third.source_path.endswith('enhanced_sickle_cell_model_backup.pkl')
+
+    reloaded = registry.load(keys[1])
+    assert reloaded is not second and reloaded.generation > second.generation
+    assert reloaded.model_version == second.model_version
+    assert [runtime.model_key for runtime in registry.resident()] == [keys[2], keys[1]]
+
+def test_named_model_is_loaded_on_first_request(client):
+    response = client.post('/predict?model=baseline', json=HIGH_RISK_PATIENT)
+    assert response.status_code == 200
+    assert response.headers['X-Model'] == 'baseline@latest'
+    assert api.model_registry.contains('baseline@latest')
+    assert client.post('/predict?model=nonexistent', json=HIGH_RISK_PATIENT).status_code == 404
+    assert client.post('/predict?model=enhanced@v999', json=HIGH_RISK_PATIENT).status_code == 404
+
+def patient_variants(count):
+    """Distinct valid patients, so no two share a prediction cache entry."""
+    return [dict(HIGH_RISK_PATIENT, age=20 + i, ldh=300 + 7 * i) for i in range(count)]
+
+def test_micro_batcher_returns_each_callers_row(client):
+    runtime = api.model_registry.get(api.canonical_model_key())
+    patients = [api.PatientData.parse_obj(record) for record in patient_variants(6)]
+    # An encoder rejects this row only when it is scored, inside the batch
+    bad = api.PatientData.parse_obj(dict(HIGH_RISK_PATIENT, hydration_level='Medium'))
+    submitted = [patients[0], patients[1], bad, patients[2], patients[3], patients[4]]
+    batcher = api.MicroBatcher(window_ms=200, max_batch_size=4)
+
+    async def submit_all():
+        return await asyncio.gather(
+            *(batcher.submit(runtime, patient) for patient in submitted), return_exceptions=True
+        )
+
+    results = asyncio.run(submit_all())
+    stats = batcher.stats()
+    # The first caller finds the batcher idle, the next four fill a batch
+    # and the last waits for the window to close
+    assert stats['immediate_flushes'] == stats['full_flushes'] == stats['window_flushes'] == 1
+    assert stats['batches'] == 3 and stats['items'] == 6 and stats['largest_batch'] == 4
+    assert stats['pending'] == 0
+
+    assert isinstance(results[2], ValueError)
+    for patient, result in zip(submitted, results):
+        if patient is bad:
+            continue
+        X, probabilities = api.score_patients(runtime, [patient])
+        row, probability = result
+        np.testing.assert_array_equal(row, X[0])
+        assert probability == probabilities[0]
+
+def test_concurrent_predictions_match_batch(client, monkeypatch):
+    batcher = api.MicroBatcher(window_ms=20, max_batch_size=16)
+    monkeypatch.setattr(api, 'micro_batcher', batcher)
+    records = patient_variants(99) + [dict(HIGH_RISK_PATIENT, hydration_level='Medium')]
+
+    async def predict_all():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as http:
+            return await asyncio.gather(*(http.post('/predict', json=record) for record in records))
+
+    responses = asyncio.run(predict_all())
+    assert batcher.stats()['largest_batch'] > 1
+    expected = client.post('/predict/batch', json=records).json()['results']
+    for response, item in zip(responses, expected):
+        if item['prediction'] is None:
+            assert response.status_code != 200
+            continue
+        assert response.status_code == 200
+        assert response.json()['crisis_probability'] == item['prediction']['crisis_probability']
+        assert response.json()['risk_level'] == item['prediction']['risk_level']
+    assert expected[-1]['prediction'] is None
+
+def test_full_scoring_queue_answers_503(client, monkeypatch):
+    pool = api.ScoringPool('thread', workers=1, max_queue=1)
+    pool.start()
+    monkeypatch.setattr(api, 'scoring_pool', pool)
+    # Pretend the only queue slot is taken by a running job
+    pool.in_flight = pool.max_queue
+    try:
+        record = dict(HIGH_RISK_PATIENT, age=77, ldh=777)
+        for path, payload in [('/predict', record), ('/predict/batch', [record])]:
+            response = client.post(path, json=payload)
+            assert response.status_code == 503
+            assert response.headers['Retry-After'] == '1'
+        assert pool.stats()['rejected'] == 2
+        assert pool.stats()['completed'] == pool.stats()['failed'] == 0
+    finally:
+        pool.in_flight = 0
+        pool.shutdown()
+
+def test_process_pool_matches_thread_pool(client):
+    runtime = api.model_registry.get(api.canonical_model_key())
+    patients = [api.PatientData.parse_obj(record) for record in patient_variants(5)]
+    bad = api.PatientData.parse_obj(dict(HIGH_RISK_PATIENT, hydration_level='Medium'))
+    pool = api.ScoringPool('process', workers=1, max_queue=4)
+    pool.start()
+    try:
+        async def score():
+            scored = await pool.run(runtime, patients)
+            with pytest.raises(ValueError):
+                await pool.run(runtime, [bad])
+            return scored
+        X, probabilities = asyncio.run(score())
+    finally:
+        pool.shutdown()
+    expected_X, expected = api.score_patients(runtime, patients)
+    np.testing.assert_array_equal(X, expected_X)
+    np.testing.assert_array_equal(probabilities, expected)
+    assert pool.stats()['completed'] == 1 and pool.stats()['failed'] == 1
+
+def test_attached_shared_state_scores_identically(client, monkeypatch, tmp_path):
+    key = api.canonical_model_key()
+    serving = api.model_registry.get(key)
+    monkeypatch.setenv('AETHERFLOW_SHARED_MODEL_DIR', str(tmp_path))
+    monkeypatch.setattr(api, 'SHARED_MODEL_DIR', str(tmp_path))
+    api.prepare_shared_model_state()
+
+    state, manifest = api.attach_model_state(api.get_shared_state_path(key))
+    assert all(isinstance(state[name], np.memmap) for name in manifest['arrays'])
+    attached = api.build_model_runtime(api.get_model_path(key), key)
+    # Only an attached runtime is built without the sklearn package
+    assert attached.package is None and attached.fused_scorer is not None
+
+    batch, _, _ = api.validate_records(load_simulated_records(PARITY_ROWS))
+    patients = [batch.row(i) for i, error in enumerate(api.find_unseen_labels(serving, batch)) if error is None]
+    assert len(patients) > 100
+    expected_X, expected = api.score_patients(serving, patients)
+    X, probabilities = api.score_patients(attached, patients)
+    np.testing.assert_array_equal(X, expected_X)
+    np.testing.assert_array_equal(probabilities, expected)
+
+def test_shared_state_is_removed_at_exit():
+    env = {name: value for name, value in os.environ.items() if name != 'AETHERFLOW_SHARED_MODEL_DIR'}
+    script = (
+        "import inference_api as api; "
+        "api.prepare_shared_model_state(); "
+        "import os; assert os.listdir(api.get_shared_state_path(api.canonical_model_key())); "
+        "print(api.SHARED_MODEL_DIR)"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', script], cwd=MODEL_DIR, env=env,
+        capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    shared_dir = result.stdout.strip().splitlines()[-1]
+    assert shared_dir and not os.path.exists(shared_dir)
+
+def scrape_metrics(client):
+    """Parse the /metrics exposition into {(name, labels): value}."""
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    samples = {}
+    for line in response.text.splitlines():
+        if line.startswith('#'):
+            assert line.split()[1] in ('HELP', 'TYPE'), line
+            continue
+        series, value = line.rsplit(' ', 1)
+        name, _, labels = series.partition('{')
+        pairs = tuple(sorted(
+            tuple(pair.split('=', 1)) for pair in labels.rstrip('}').split(',') if pair
+        ))
+        samples[name, tuple((key, value.strip('"')) for key, value in pairs)] = float(value)
+    return samples
+
+def histogram_count(samples, name, **labels):
+    return samples.get((f'{name}_count', tuple(sorted(labels.items()))), 0.0)
+
+def check_histograms(samples):
+    """Buckets are cumulative and the +Inf bucket equals the count."""
+    buckets = {}
+    for (name, labels), value in samples.items():
+        if name.endswith('_bucket'):
+            le = dict(labels)['le']
+            rest = tuple(pair for pair in labels if pair[0] != 'le')
+            buckets.setdefault((name[:-len('_bucket')], rest), []).append((float(le), value))
+    assert buckets
+    for (name, labels), series in buckets.items():
+        counts = [value for _, value in sorted(series)]
+        assert counts == sorted(counts), name
+        assert counts[-1] == samples[f'{name}_count', labels], name
+
+def test_metrics_histograms_move_with_predictions(client):
+    if not api.prediction_cache.enabled:
+        pytest.skip("prediction cache disabled")
+    record = dict(HIGH_RISK_PATIENT, age=61, ldh=613)
+    latency, stages = 'aetherflow_request_latency_seconds', 'aetherflow_stage_latency_seconds'
+    scrapes = [scrape_metrics(client)]
+    for _ in range(2):
+        assert client.post('/predict', json=record).status_code == 200
+        scrapes.append(scrape_metrics(client))
+    for samples in scrapes:
+        check_histograms(samples)
+
+    before, miss, hit = scrapes
+    for previous, current in [(before, miss), (miss, hit)]:
+        assert histogram_count(current, latency, endpoint='/predict') == histogram_count(previous, latency, endpoint='/predict') + 1
+        assert histogram_count(current, stages, stage='serialization') == histogram_count(previous, stages, stage='serialization') + 1
+        key = ('aetherflow_requests_total', (('endpoint', '/predict'), ('status', '200')))
+        assert current[key] == previous.get(key, 0.0) + 1
+        key = ('aetherflow_predictions_total', (('risk_level', 'High'),))
+        assert current[key] == previous.get(key, 0.0) + 1
+    # Only the miss reached the model
+    assert histogram_count(miss, stages, stage='predict_proba') > histogram_count(before, stages, stage='predict_proba')
+    assert histogram_count(hit, stages, stage='predict_proba') == histogram_count(miss, stages, stage='predict_proba')
+    assert hit['aetherflow_prediction_cache_hits', ()] == miss['aetherflow_prediction_cache_hits', ()] + 1
+
+def stream_results(client, content, **headers):
+    response = client.post('/predict/stream', content=content, headers=headers)
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def in_chunks(data, size):
+    return (data[start:start + size] for start in range(0, len(data), size))
+
+def test_stream_keeps_multiline_csv_fields_and_skips_long_lines(client, monkeypatch):
+    monkeypatch.setattr(api, 'STREAM_MAX_LINE_BYTES', 4096)
+    records = patient_variants(3)
+    notes = ['first line\nsecond, "quoted" line', 'x' * 5000, '']
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(records[0]) + ['notes'], lineterminator='\n')
+    writer.writeheader()
+    for record, note in zip(records, notes):
+        writer.writerow(dict(record, notes=note))
+    upload = buffer.getvalue().encode('utf-8')
+
+    expected = client.post('/predict/batch', json=records).json()['results']
+    for content in (upload, in_chunks(upload, 97), gzip.compress(upload)):
+        results = stream_results(client, content, **{'Content-Type': 'text/csv'})
+        assert [item['index'] for item in results] == [0, 1, 2]
+        assert results[1]['prediction'] is None
+        assert results[1]['error'] == 'Line longer than 4096 bytes'
+        for i in (0, 2):
+            assert results[i]['prediction']['crisis_probability'] == expected[i]['prediction']['crisis_probability']
+
+    results = stream_results(client, upload + b'1,"unterminated\n', **{'Content-Type': 'text/csv'})
+    assert results[-1]['error'] == 'CSV record ends inside a quoted field'
+
+def test_stream_bounds_inflated_gzip_lines(client):
+    records = patient_variants(2)
+    lines = [json.dumps(records[0]), 'x' * (api.STREAM_MAX_LINE_BYTES * 8), json.dumps(records[1])]
+    upload = gzip.compress('\n'.join(lines).encode('utf-8'))
+    # The overlong line compresses to a tiny fraction of its size
+    assert len(upload) < api.STREAM_MAX_LINE_BYTES // 10
+
+    results = stream_results(client, in_chunks(upload, 1024), **{'Content-Encoding': 'gzip'})
+    assert [item['error'] for item in results] == [
+        None, f"Line longer than {api.STREAM_MAX_LINE_BYTES} bytes", None
+    ]
+    expected = client.post('/predict/batch', json=records).json()['results']
+    for result, item in zip([results[0], results[2]], expected):
+        assert result['prediction']['crisis_probability'] == item['prediction']['crisis_probability']
+
+def negotiate(accept):
+    return api.negotiate_media_type(SimpleNamespace(headers={'accept': accept}))
+
+@pytest.mark.parametrize('accept, expected', [
+    ('', api.JSON_MEDIA_TYPE),
+    ('text/html', api.JSON_MEDIA_TYPE),
+    ('application/msgpack', api.MSGPACK_MEDIA_TYPE),
+    ('application/json, application/msgpack', api.JSON_MEDIA_TYPE),
+    ('application/json;q=0.5, application/msgpack', api.MSGPACK_MEDIA_TYPE),
+    ('application/msgpack;q=0, application/json', api.JSON_MEDIA_TYPE),
+    ('application/x-msgpack;q=0.9, application/vnd.apache.arrow.stream;q=0.9', api.MSGPACK_MEDIA_TYPE),
+    ('*/*;q=0.2, application/vnd.msgpack;q=0.8', api.MSGPACK_MEDIA_TYPE),
+    ('application/msgpack;q=high, application/json;q=0.1', api.JSON_MEDIA_TYPE)
+])
+def test_accept_q_values_pick_the_media_type(monkeypatch, accept, expected):
+    # The choice must not depend on which wire libraries are installed
+    monkeypatch.setattr(api, 'import_wire_format', lambda media_type, status_code: None)
+    assert negotiate(accept) == expected
+
+def test_missing_wire_library_falls_back_or_406(monkeypatch):
+    def unavailable(media_type, status_code):
+        raise HTTPException(status_code=status_code, detail=f"{media_type} is not available")
+    monkeypatch.setattr(api, 'import_wire_format', unavailable)
+    assert negotiate('application/msgpack, application/json;q=0.5') == api.JSON_MEDIA_TYPE
+    with pytest.raises(HTTPException) as raised:
+        negotiate('application/msgpack, text/html')
+    assert raised.value.status_code == 406
+
+def test_msgpack_round_trip(client):
+    msgpack = pytest.importorskip('msgpack')
+    records = patient_variants(3) + [dict(HIGH_RISK_PATIENT, age=-1)]
+    headers = {'Content-Type': api.MSGPACK_MEDIA_TYPE, 'Accept': 'application/json;q=0.5, application/msgpack'}
+
+    response = client.post('/predict', content=msgpack.packb(records[0]), headers=headers)
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith(api.MSGPACK_MEDIA_TYPE)
+    single = msgpack.unpackb(response.content, raw=False)
+    expected = client.post('/predict', json=records[0]).json()
+    assert single['crisis_probability'] == expected['crisis_probability']
+    assert single['top_risk_factors'] == expected['top_risk_factors']
+
+    response = client.post('/predict/batch', content=msgpack.packb(records), headers=headers)
+    assert response.status_code == 200
+    batch = msgpack.unpackb(response.content, raw=False)['results']
+    expected = client.post('/predict/batch', json=records).json()['results']
+    assert [item['error'] for item in batch] == [item['error'] for item in expected]
+    assert [item['prediction'] and item['prediction']['crisis_probability'] for item in batch] == \
+        [item['prediction'] and item['prediction']['crisis_probability'] for item in expected]
+
+def test_arrow_round_trip(client):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.ipc
+    records = patient_variants(3) + [dict(HIGH_RISK_PATIENT, age=-1)]
+    table = pyarrow.Table.from_pylist(records)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    headers = {'Content-Type': api.ARROW_MEDIA_TYPE, 'Accept': api.ARROW_MEDIA_TYPE}
+
+    response = client.post('/predict/batch', content=sink.getvalue().to_pybytes(), headers=headers)
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith(api.ARROW_MEDIA_TYPE)
+    rows = pyarrow.ipc.open_stream(response.content).read_all().to_pylist()
+    expected = client.post('/predict/batch', json=records).json()['results']
+    assert [row['index'] for row in rows] == [item['index'] for item in expected]
+    assert [row['error'] for row in rows] == [item['error'] for item in expected]
+    assert [row['crisis_probability'] for row in rows] == \
+        [item['prediction'] and item['prediction']['crisis_probability'] for item in expected]
+
+def test_contributions_sum_to_logit(client):
+    key = api.canonical_model_key()
+    runtime = api.model_registry.get(key)
+    state, _ = api.load_model_state(api.get_model_path(key))
+    patients = [api.PatientData.parse_obj(record) for record in patient_variants(20)]
+    patients.append(api.PatientData.parse_obj(LOW_RISK_PATIENT))
+    X, probabilities = api.score_patients(runtime, patients)
+
+    width = len(runtime.explain_indices)
+    positions, contributions = api.explain_contributions(runtime, X, k=width)
+    assert sorted(positions[0].tolist()) == list(range(width))
+    logits = np.log(probabilities / (1 - probabilities))
+    np.testing.assert_allclose(contributions.sum(axis=1) + state['intercept'], logits, rtol=0, atol=1e-9)
+
+    top_positions, top = api.explain_contributions(runtime, X)
+    assert top.shape == (len(patients), api.TOP_RISK_FACTORS)
+    magnitudes = np.abs(top)
+    assert (magnitudes[:, :-1] >= magnitudes[:, 1:]).all()
+    # The top-k are the k largest in magnitude, with their signs kept
+    np.testing.assert_array_equal(magnitudes, np.abs(contributions)[:, :api.TOP_RISK_FACTORS])
+    by_position = np.empty_like(contributions)
+    np.put_along_axis(by_position, positions, contributions, axis=1)
+    np.testing.assert_array_equal(top, np.take_along_axis(by_position, top_positions, axis=1))
+
+@pytest.mark.parametrize('worker_ready_dir', [False, True])
+def test_worker_announces_unless_parent_collects(monkeypatch, tmp_path, capsys, worker_ready_dir):
+    ready_file = tmp_path / 'ready.json'
+    ready_dir = tmp_path / 'workers'
+    ready_dir.mkdir()
+    monkeypatch.setattr(api.multiprocessing, 'parent_process', lambda: object())
+    monkeypatch.setattr(api, 'WORKER_READY_DIR', str(ready_dir) if worker_ready_dir else None)
+    monkeypatch.setattr(api, 'READY_LINE_ENABLED', True)
+    monkeypatch.setattr(api, 'READY_FILE', str(ready_file))
+    monkeypatch.setattr(api, 'SERVER_PORT', 8123)
+    monkeypatch.setattr(api, 'ready_file_written', False)
+
+    api.announce_ready('enhanced@latest')
+    printed = capsys.readouterr().out
+    if worker_ready_dir:
+        # e.g. a worker of "python inference_api.py" with AETHERFLOW_WORKERS=2
+        assert printed == '' and not ready_file.exists()
+        assert (ready_dir / f'{os.getpid()}.ready').read_text() == 'enhanced@latest'
+    else:
+        # e.g. a worker of "uvicorn --workers 2" or the "--reload" child
+        assert printed == f'{api.READY_LINE_PREFIX} host={api.SERVER_HOST} port=8123 model=enhanced@latest\n'
+        assert json.loads(ready_file.read_text())['port'] == 8123
+        assert os.listdir(ready_dir) == []
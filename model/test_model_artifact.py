@@ -0,0 +1,91 @@
+"""
+Tests for the pickle-free model artifacts.
+
+An artifact whose pickle was changed after export must be refused in favour
+of the pickle, and a deployed artifact must score like the pickle without
+sklearn installed.
+
+    python -m pytest test_model_artifact.py
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+os.environ.setdefault('AETHERFLOW_READY_LINE', '0')
+
+import joblib
+import pytest
+
+import inference_api as api
+from model_artifact import ArtifactMismatchError, get_artifact_path, load_model_artifact
+from test_api import HIGH_RISK_PATIENT
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(MODEL_DIR, 'enhanced_sickle_cell_model.pkl')
+
+# Run in a fresh interpreter where sklearn and joblib cannot be imported
+SCORE_WITHOUT_SKLEARN = """
+import json, sys
+
+class BlockSklearn:
+    def find_spec(self, name, path=None, target=None):
+        if name.split('.')[0] in ('sklearn', 'joblib'):
+            raise ImportError(f"{name} is blocked")
+        return None
+
+sys.meta_path.insert(0, BlockSklearn())
+import inference_api as api
+
+runtime = api.build_model_runtime(sys.argv[1])
+X, probabilities = api.score_patients(runtime, [api.PatientData(**json.loads(sys.argv[2]))])
+print(json.dumps({
+    'probability': float(probabilities[0]),
+    'fused': runtime.fused_scorer is not None,
+    'sklearn_loaded': any(name.split('.')[0] in ('sklearn', 'joblib') for name in sys.modules)
+}))
+"""
+
+def score(runtime, record):
+    _, probabilities = api.score_patients(runtime, [api.PatientData(**record)])
+    return float(probabilities[0])
+
+def test_edited_pickle_falls_back_to_pickle(tmp_path, caplog):
+    model_path = str(tmp_path / os.path.basename(MODEL_PATH))
+    shutil.copy(MODEL_PATH, model_path)
+    shutil.copy(get_artifact_path(MODEL_PATH), get_artifact_path(model_path))
+    state, _ = load_model_artifact(get_artifact_path(model_path), model_path)
+
+    # Re-save the pickle with different metadata, after the artifact was exported
+    package = joblib.load(model_path)
+    package['model_info'] = dict(package.get('model_info', {}), best_model='edited after export')
+    joblib.dump(package, model_path)
+
+    with pytest.raises(ArtifactMismatchError):
+        load_model_artifact(get_artifact_path(model_path), model_path)
+    runtime = api.build_model_runtime(model_path)
+    assert runtime.package is not None
+    assert runtime.model_version == 'edited after export'
+    assert 'loading the pickle instead' in caplog.text
+    assert score(runtime, HIGH_RISK_PATIENT) == pytest.approx(
+        score(api.ModelRuntime(state), HIGH_RISK_PATIENT), abs=1e-12
+    )
+
+def test_deployed_artifact_scores_without_sklearn(tmp_path):
+    model_path = str(tmp_path / os.path.basename(MODEL_PATH))
+    # Only the artifact is deployed; the pickle path is what the server is configured with
+    shutil.copy(get_artifact_path(MODEL_PATH), get_artifact_path(model_path))
+
+    result = subprocess.run(
+        [sys.executable, '-c', SCORE_WITHOUT_SKLEARN, model_path, json.dumps(HIGH_RISK_PATIENT)],
+        cwd=MODEL_DIR, capture_output=True, text=True, timeout=120,
+        env=dict(os.environ, AETHERFLOW_READY_LINE='0')
+    )
+    assert result.returncode == 0, result.stderr
+    scored = json.loads(result.stdout.strip().splitlines()[-1])
+    assert scored['fused'] and not scored['sklearn_loaded']
+
+    expected = score(api.build_model_runtime(MODEL_PATH), HIGH_RISK_PATIENT)
+    assert scored['probability'] == pytest.approx(expected, abs=api.FUSED_SCORER_TOLERANCE)
@@ -0,0 +1,206 @@
+"""
+Parity tests for the cohort simulator.
+
+The vectorized generator (generate_cohort) draws from a different random
+stream than the per-patient generator it replaces, so the two are compared
+statistically: values are averaged per patient first, since days of the same
+patient are correlated, and the cohort means must agree within a few
+standard errors.
+
+    python -m pytest test_simulate.py
+"""
+
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import simulate
+
+# Patients simulated by each generator
+LEGACY_PATIENTS = 400
+VECTORIZED_PATIENTS = 4000
+
+# Allowed difference of cohort means, in standard errors
+MAX_Z = 4.5
+
+def config_with(num_patients):
+    config = copy.deepcopy(simulate.CONFIG)
+    config['simulation_params']['num_patients'] = num_patients
+    return config
+
+@pytest.fixture(scope='module')
+def legacy():
+    """The per-patient generator's output, as main() used to assemble it."""
+    np.random.seed(2024)
+    config = config_with(LEGACY_PATIENTS)
+    profiles = simulate.generate_patient_profiles(config)
+    records = []
+    for _, profile in profiles.iterrows():
+        records.extend(simulate.generate_patient_trajectory(profile, config))
+    return pd.merge(pd.DataFrame(records), profiles, on='PatientID')
+
+@pytest.fixture(scope='module')
+def vectorized():
+    return simulate.generate_cohort(config_with(VECTORIZED_PATIENTS), np.random.default_rng(2024))
+
+def per_patient_means(df):
+    """Numeric columns plus one indicator per category, averaged per patient."""
+    values = df.drop(columns=['Day']).copy()
+    for col in ('Sex', 'Genotype', 'HydrationLevel'):
+        for category in ('Male', 'Female', 'HbSS', 'HbSC', 'HbS_beta_thal', 'Low', 'Normal', 'High'):
+            if (df[col] == category).any():
+                values[f'{col}={category}'] = (df[col] == category).astype(float)
+        values = values.drop(columns=col)
+    return values.groupby('PatientID').mean()
+
+def test_same_columns_and_dtypes(legacy, vectorized):
+    assert list(vectorized.columns) == list(legacy.columns)
+    assert (vectorized.dtypes == legacy.dtypes).all()
+
+def test_layout(vectorized):
+    days = simulate.CONFIG['simulation_params']['days_per_patient']
+    assert len(vectorized) == VECTORIZED_PATIENTS * days
+    assert (vectorized['Day'].to_numpy() == np.tile(np.arange(1, days + 1), VECTORIZED_PATIENTS)).all()
+    assert (vectorized['PatientID'].to_numpy() == np.repeat(np.arange(1, VECTORIZED_PATIENTS + 1), days)).all()
+    # Profile columns are constant within a patient
+    assert (vectorized.groupby('PatientID')[['Age', 'Sex', 'Genotype', 'HbF_percent']].nunique() == 1).all().all()
+
+def test_value_ranges(vectorized):
+    binary = ['Fatigue', 'Fever', 'JointPain', 'Dactylitis', 'Shortness_of_Breath', 'MedicationAdherence',
+              'Hydroxyurea', 'PainMed', 'History_of_ACS', 'Coexisting_Asthma']
+    assert vectorized[binary].isin([0, 1]).all().all()
+    assert vectorized['PainLevel'].between(0, 10).all()
+    assert vectorized['Sleep_Quality'].between(-1, 5).all()
+    assert vectorized['Reported_Stress_Level'].between(1, 7).all()
+    assert vectorized['Age'].between(18, 54).all()
+    assert set(vectorized['HydrationLevel'].unique()) == {'Low', 'Normal', 'High'}
+    assert ((vectorized['CRP'] > 20) == (vectorized['Fever'] == 1)).all()
+
+def test_means_match(legacy, vectorized):
+    old = per_patient_means(legacy)
+    new = per_patient_means(vectorized)
+    for col in old.columns:
+        standard_error = np.sqrt(old[col].var() / len(old) + new[col].var() / len(new))
+        difference = abs(old[col].mean() - new[col].mean())
+        assert difference <= MAX_Z * standard_error + 1e-12, f"{col}: {old[col].mean()} vs {new[col].mean()}"
+
+def test_pain_autocorrelation_matches(legacy, vectorized):
+    def lag_one(df):
+        pain = df['PainLevel'].to_numpy(dtype=float)
+        same_patient = df['PatientID'].to_numpy()[1:] == df['PatientID'].to_numpy()[:-1]
+        return np.corrcoef(pain[1:][same_patient], pain[:-1][same_patient])[0, 1]
+    assert abs(lag_one(legacy) - lag_one(vectorized)) < 0.05
+
+def test_seeded_generator_is_reproducible():
+    config = config_with(50)
+    first = simulate.generate_cohort(config, np.random.default_rng(7))
+    second = simulate.generate_cohort(config, np.random.default_rng(7))
+    pd.testing.assert_frame_equal(first, second)
+
+def reference_assign_labels(df):
+    """assign_labels_dynamically as it was written before it was vectorized."""
+    prob_threshold = df['P_Crisis'].median()
+    df['CrisisLikely'] = (df['P_Crisis'] > prob_threshold).astype(int)
+    df['CrisisNext48h'] = 0
+    for pid in df['PatientID'].unique():
+        patient_df = df[df['PatientID'] == pid]
+        crisis_idx = patient_df.index[patient_df['CrisisLikely'] == 1].tolist()
+        for idx in crisis_idx:
+            for offset in range(1, 3):
+                prev_idx = idx - offset
+                if prev_idx in patient_df.index:
+                    df.at[prev_idx, 'CrisisNext48h'] = 1
+    df['PriorCrises'] = 0
+    for pid in df['PatientID'].unique():
+        patient_mask = df['PatientID'] == pid
+        crisis_cumsum = df.loc[patient_mask, 'CrisisLikely'].cumsum().shift(1).fillna(0)
+        df.loc[patient_mask, 'PriorCrises'] = crisis_cumsum.astype(int)
+    return df
+
+@pytest.fixture(scope='module')
+def scored():
+    np.random.seed(11)
+    cohort = simulate.generate_cohort(config_with(300), np.random.default_rng(11))
+    return simulate.calculate_crisis_probability(cohort, simulate.CONFIG)
+
+@pytest.mark.parametrize('layout', ['sorted', 'shuffled', 'gaps'])
+def test_labels_identical_to_reference(scored, layout):
+    df = scored.copy()
+    if layout == 'shuffled':
+        df = df.sample(frac=1, random_state=3)
+    elif layout == 'gaps':
+        # Non-contiguous index labels: a gap breaks the 48h window, as before
+        df.index = df.index * 2 - (df.index % 7 == 0)
+    expected = reference_assign_labels(df.copy())
+    result = simulate.assign_labels_dynamically(df.copy())
+    pd.testing.assert_frame_equal(result, expected)
+
+def test_vectorized_sigmoid_matches_scalar():
+    x = np.concatenate([np.random.default_rng(5).normal(0, 10, 10000), [-800, -500.5, -500, 0, 40, 800]])
+    expected = np.array([simulate.sigmoid(value) for value in x], dtype=float)
+    np.testing.assert_allclose(simulate.sigmoid_array(x), expected, rtol=1e-15, atol=0)
+    assert simulate.sigmoid_array([-501])[0] == 0.0
+
+def test_parallel_output_is_independent_of_worker_count():
+    config = config_with(230)
+    config['simulation_params'].update({'seed': 99, 'shard_size': 40})
+    serial, master = simulate.simulate_cohort(config, workers=1)
+    parallel, _ = simulate.simulate_cohort(config, workers=3)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert master.entropy == 99
+    assert serial['PatientID'].nunique() == 230
+    assert list(serial.columns[-2:]) == ['CrisisLikely', 'CrisisNext48h']
+
+def test_different_seeds_differ():
+    config = config_with(20)
+    config['simulation_params']['seed'] = 1
+    first, _ = simulate.simulate_cohort(config)
+    config['simulation_params']['seed'] = 2
+    second, _ = simulate.simulate_cohort(config)
+    assert not first['WBC_Count'].equals(second['WBC_Count'])
+
+def test_streamed_csv_matches_in_memory_cohort(tmp_path):
+    config = config_with(130)
+    config['simulation_params'].update({'seed': 5, 'shard_size': 30, 'label_threshold': 0.8})
+    expected, _ = simulate.simulate_cohort(config)
+    path = tmp_path / 'cohort.csv'
+    stats = simulate.write_cohort(config, str(path), 'csv', workers=2)
+    assert stats['shards'] == 5 and stats['rows'] == len(expected)
+    assert path.read_text() == expected.to_csv(index=False)
+
+def test_streamed_parquet_parts(tmp_path):
+    pytest.importorskip('pyarrow')
+    config = config_with(70)
+    config['simulation_params'].update({'seed': 5, 'shard_size': 30, 'label_threshold': 0.8})
+    expected, _ = simulate.simulate_cohort(config)
+    simulate.write_cohort(config, str(tmp_path), 'parquet')
+    parts = sorted(tmp_path.glob('part-*.parquet'))
+    assert len(parts) == 3
+    streamed = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
+
+def test_streaming_needs_a_label_threshold(tmp_path):
+    config = config_with(10)
+    with pytest.raises(ValueError, match='label_threshold'):
+        simulate.write_cohort(config, str(tmp_path / 'cohort.csv'))
+    assert not (tmp_path / 'cohort.csv').exists()
+
+@pytest.mark.parametrize('output_file, file_format, expected', [
+    (None, None, None),
+    ('cohort.csv', None, 'csv'),
+    ('cohort.CSV', 'csv', 'csv'),
+    ('cohort.parquet/', None, 'parquet'),
+    ('cohort_out', 'parquet', 'parquet'),
+    ('cohort.txt', 'csv', 'csv'),
+    (None, 'csv', ValueError),
+    ('cohort_out', None, ValueError),
+    ('cohort.csv', 'parquet', ValueError)
+])
+def test_output_format(output_file, file_format, expected):
+    if expected is ValueError:
+        with pytest.raises(ValueError):
+            simulate.resolve_output_format(output_file, file_format)
+    else:
+        assert simulate.resolve_output_format(output_file, file_format) == expected
@@ -10,6 +10,7 @@ from sklearn.impute import SimpleImputer
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, roc_curve
 from sklearn.pipeline import Pipeline
 import joblib
+from model_artifact import export_model_artifact, get_artifact_path
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
@@ -205,6 +206,14 @@ class SickleCellCrisisModel:
         
         joblib.dump(model_package, filepath)
         print(f"Model saved to {filepath}")
+        
+        # Pickle-free copy for the inference server (linear models only)
+        artifact_path = get_artifact_path(filepath)
+        try:
+            export_model_artifact(model_package, artifact_path, filepath)
+            print(f"Pickle-free artifact saved to {artifact_path}")
+        except ValueError as e:
+            print(f"Skipping pickle-free artifact: {e}")
     
     def load_model(self, filepath='sickle_cell_crisis_model.pkl'):
         """Load a trained model."""